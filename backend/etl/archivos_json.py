@@ -0,0 +1,59 @@
+"""
+Lectura y escritura de los JSON del ETL.
+
+Usa orjson si está instalado. La salida es la misma con o sin él:
+indentación de 2 y caracteres no ASCII sin escapar.
+"""
+
+import json
+from pathlib import Path
+
+try:
+    import orjson  # Opcional: lectura/escritura más rápida
+except ImportError:
+    orjson = None
+
+
+def _dumps_indent2(obj) -> bytes:
+    """JSON con indentación de 2 (orjson con OPT_INDENT_2 da los mismos bytes que json)."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def leer_json(ruta: Path):
+    """Lee un archivo JSON (con orjson si está disponible)."""
+    if orjson:
+        with open(ruta, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def escribir_json(ruta: Path, datos):
+    """Escribe un archivo JSON con indentación de 2 (mismo formato con o sin orjson)."""
+    with open(ruta, 'wb') as f:
+        f.write(_dumps_indent2(datos))
+
+
+def escribir_contenido(ruta: Path, contenido: dict, articulos) -> int:
+    """Escribe contenido.json serializando un artículo a la vez.
+
+    contenido lleva "articulos": [] como marcador y articulos es un iterable
+    de dicts. El archivo queda igual que escribir_json del dict completo,
+    sin tener en memoria los dicts de todos los artículos a la vez.
+    Retorna el número de artículos escritos.
+    """
+    cabecera, cola = _dumps_indent2(contenido).split(b'"articulos": []', 1)
+    total = 0
+    with open(ruta, 'wb') as f:
+        f.write(cabecera)
+        f.write(b'"articulos": [')
+        for articulo in articulos:
+            f.write(b',\n    ' if total else b'\n    ')
+            # JSON no tiene saltos de línea dentro de cadenas: se puede re-indentar
+            f.write(_dumps_indent2(articulo).replace(b'\n', b'\n    '))
+            total += 1
+        f.write(b'\n  ]' if total else b']')
+        f.write(cola)
+    return total
@@ -6,72 +6,165 @@ Uso:
     python backend/etl/checksums.py CFF --guardar    # Guarda checksums actuales como referencia
     python backend/etl/checksums.py CFF --comparar  # Compara BD contra referencia guardada
     python backend/etl/checksums.py CFF --diff 66   # Muestra diferencia de un artículo específico
+    python backend/etl/checksums.py CFF --diff 66,67,69-B   # Varios artículos en una sola consulta
+    python backend/etl/checksums.py CFF --diff-modificados  # Todos los modificados según --comparar
 """
 
-import hashlib
-import json
 import os
 import sys
 from pathlib import Path
 
 try:
     import psycopg2
+    from psycopg2.extras import execute_values
 except ImportError:
     print("Error: psycopg2 no instalado")
     sys.exit(1)
 
+from archivos_json import leer_json, escribir_json
+
 BASE_DIR = Path(__file__).parent.parent.parent
 
+# Checksum por artículo: SHA256 (truncado a 16) del contenido concatenado de
+# sus párrafos, calculado en PostgreSQL. Parámetro: ley.
+# Los párrafos se agregan por artículo en un LATERAL (recorrido de la PK de
+# parrafos) en lugar de agrupar todo el JOIN por (numero, orden).
+SQL_CHECKSUMS = """
+    SELECT
+        a.numero,
+        a.orden,
+        substr(encode(sha256(convert_to(agg.contenido, 'UTF8')), 'hex'), 1, 16) as checksum
+    FROM leyesmx.articulos a
+    JOIN LATERAL (
+        SELECT STRING_AGG(p.contenido, E'\\n' ORDER BY p.numero) as contenido
+        FROM leyesmx.parrafos p
+        WHERE p.ley = a.ley AND p.articulo_id = a.id
+    ) agg ON agg.contenido IS NOT NULL
+    WHERE a.ley = %s
+"""
+
+
+# Conexión compartida por todas las acciones del proceso (ver get_connection)
+_conexion = None
+
 
 def get_connection():
-    return psycopg2.connect(
-        host=os.environ.get("PG_HOST", "localhost"),
-        port=os.environ.get("PG_PORT", "5432"),
-        database=os.environ.get("PG_DB", "digiapps"),
-        user=os.environ.get("PG_USER", "leyesmx"),
-        password=os.environ.get("PG_PASS", "leyesmx")
-    )
+    """Retorna la conexión del proceso, abriéndola solo la primera vez."""
+    global _conexion
+    if _conexion is None or _conexion.closed:
+        _conexion = psycopg2.connect(
+            host=os.environ.get("PG_HOST", "localhost"),
+            port=os.environ.get("PG_PORT", "5432"),
+            database=os.environ.get("PG_DB", "digiapps"),
+            user=os.environ.get("PG_USER", "leyesmx"),
+            password=os.environ.get("PG_PASS", "leyesmx")
+        )
+    return _conexion
+
 
+def release_connection(conn):
+    """Termina la transacción de lectura y deja la conexión lista para reutilizarse."""
+    if not conn.closed:
+        conn.rollback()
 
-def calcular_checksum(texto: str) -> str:
-    """Calcula SHA256 de un texto."""
-    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+def cerrar_conexion():
+    """Cierra la conexión compartida (al terminar el proceso)."""
+    global _conexion
+    if _conexion is not None and not _conexion.closed:
+        _conexion.close()
+    _conexion = None
 
 
 def obtener_checksums_bd(conn, ley: str) -> dict:
-    """Obtiene checksums de todos los artículos de una ley desde la BD."""
-    checksums = {}
+    """Obtiene checksums de todos los artículos de una ley desde la BD.
+
+    El SHA256 se calcula en PostgreSQL: solo viajan 16 caracteres por artículo
+    en lugar del contenido completo. Se usa un cursor del lado del servidor
+    para recibir las filas por lotes en vez de materializarlas todas.
+    """
+    with conn.cursor(name=f"chk_{ley.lower()}") as cur:
+        cur.itersize = 2000
+        cur.execute(f"""
+            SELECT numero, checksum
+            FROM ({SQL_CHECKSUMS}) c
+            ORDER BY orden
+        """, (ley,))
+
+        return {numero: checksum for numero, checksum in cur}
 
+
+def obtener_marca_bd(conn, ley: str) -> str | None:
+    """Obtiene una marca de la última importación de párrafos de una ley.
+
+    importar.py reescribe todos los párrafos de la ley (con fecha_importacion
+    nueva), así que si la marca no cambió tampoco cambiaron los checksums.
+    """
     with conn.cursor() as cur:
-        # Obtener contenido concatenado de párrafos por artículo
         cur.execute("""
-            SELECT
-                a.numero,
-                STRING_AGG(p.contenido, E'\n' ORDER BY p.numero) as contenido_completo
-            FROM leyesmx.articulos a
-            JOIN leyesmx.parrafos p ON p.articulo_id = a.id AND p.ley = a.ley
-            WHERE a.ley = %s
-            GROUP BY a.numero, a.orden
-            ORDER BY a.orden
+            SELECT COUNT(*), MAX(fecha_importacion)
+            FROM leyesmx.parrafos
+            WHERE ley = %s
         """, (ley,))
-
-        for numero, contenido in cur.fetchall():
-            checksums[numero] = calcular_checksum(contenido)
-
-    return checksums
+        total, ultima = cur.fetchone()
+        if not total:
+            return None
+        return f"{total}@{ultima.isoformat()}"
 
 
 def obtener_contenido_articulo(conn, ley: str, numero: str) -> str:
     """Obtiene el contenido completo de un artículo."""
+    return obtener_contenidos(conn, ley, [numero]).get(numero, "")
+
+
+def obtener_contenidos(conn, ley: str, numeros: list[str]) -> dict[str, str]:
+    """Obtiene el contenido completo de varios artículos en una sola consulta."""
     with conn.cursor() as cur:
         cur.execute("""
-            SELECT STRING_AGG(p.contenido, E'\n' ORDER BY p.numero)
+            SELECT a.numero, STRING_AGG(p.contenido, E'\n' ORDER BY p.numero)
             FROM leyesmx.articulos a
             JOIN leyesmx.parrafos p ON p.articulo_id = a.id AND p.ley = a.ley
-            WHERE a.ley = %s AND a.numero = %s
-        """, (ley, numero))
-        result = cur.fetchone()
-        return result[0] if result and result[0] else ""
+            WHERE a.ley = %s AND a.numero = ANY(%s)
+            GROUP BY a.numero
+        """, (ley, list(numeros)))
+        return {numero: contenido for numero, contenido in cur.fetchall() if contenido}
+
+
+def obtener_diferencias_bd(conn, ley: str, verificados: dict) -> list[tuple[str, str]]:
+    """Compara en la BD los checksums actuales contra los verificados.
+
+    Sube los verificados a una tabla temporal y resuelve la comparación con
+    un FULL OUTER JOIN: solo regresan los artículos con diferencias, como
+    ('modificados' | 'nuevos' | 'eliminados', numero).
+    """
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE checksums_ref (
+                numero TEXT PRIMARY KEY,
+                checksum TEXT NOT NULL,
+                orden INTEGER NOT NULL
+            ) ON COMMIT DROP
+        """)
+        execute_values(
+            cur,
+            "INSERT INTO checksums_ref (numero, checksum, orden) VALUES %s",
+            [(numero, checksum, i) for i, (numero, checksum) in enumerate(verificados.items())],
+            page_size=1000
+        )
+        cur.execute(f"""
+            SELECT
+                CASE
+                    WHEN r.numero IS NULL THEN 'nuevos'
+                    WHEN act.numero IS NULL THEN 'eliminados'
+                    ELSE 'modificados'
+                END,
+                COALESCE(act.numero, r.numero)
+            FROM ({SQL_CHECKSUMS}) act
+            FULL OUTER JOIN checksums_ref r ON r.numero = act.numero
+            WHERE act.checksum IS DISTINCT FROM r.checksum
+            ORDER BY act.orden NULLS LAST, r.orden
+        """, (ley,))
+        return cur.fetchall()
 
 
 def ruta_checksums(ley: str) -> Path:
@@ -80,26 +173,45 @@ def ruta_checksums(ley: str) -> Path:
     return BASE_DIR / f"backend/etl/data/{ley_lower}/checksums_verificados.json"
 
 
+def cargar_verificados(ruta: Path) -> tuple[str | None, dict]:
+    """Carga (marca_bd, checksums) de un archivo de referencia.
+
+    Acepta también el formato anterior (solo el dict de checksums, sin marca).
+    """
+    datos = leer_json(ruta)
+
+    if "checksums" in datos and "marca_bd" in datos:
+        return datos["marca_bd"], datos["checksums"]
+    return None, datos
+
+
 def guardar_checksums(ley: str):
     """Guarda checksums actuales de la BD como referencia verificada."""
+    ruta = ruta_checksums(ley)
+
     conn = get_connection()
     try:
+        marca = obtener_marca_bd(conn, ley)
+
+        # Sin reimportación desde la última referencia: nada que recalcular
+        if marca and ruta.exists() and cargar_verificados(ruta)[0] == marca:
+            print(f"Sin cambios en BD desde la última referencia ({ruta.name})")
+            return True
+
         checksums = obtener_checksums_bd(conn, ley)
 
         if not checksums:
             print(f"No se encontraron artículos para {ley}")
             return False
 
-        ruta = ruta_checksums(ley)
         ruta.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(ruta, 'w', encoding='utf-8') as f:
-            json.dump(checksums, f, indent=2, ensure_ascii=False)
+        escribir_json(ruta, {"marca_bd": marca, "checksums": checksums})
 
         print(f"Guardados {len(checksums)} checksums en {ruta.name}")
         return True
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def comparar_checksums(ley: str) -> dict:
@@ -111,54 +223,55 @@ def comparar_checksums(ley: str) -> dict:
         print(f"Ejecuta primero: python backend/etl/checksums.py {ley} --guardar")
         return None
 
-    with open(ruta, 'r', encoding='utf-8') as f:
-        verificados = json.load(f)
+    marca_verificada, verificados = cargar_verificados(ruta)
 
     conn = get_connection()
     try:
-        actuales = obtener_checksums_bd(conn, ley)
-
         cambios = {
             'modificados': [],
             'nuevos': [],
             'eliminados': []
         }
 
-        # Detectar modificados y nuevos
-        for numero, checksum in actuales.items():
-            if numero not in verificados:
-                cambios['nuevos'].append(numero)
-            elif verificados[numero] != checksum:
-                cambios['modificados'].append(numero)
+        # Misma importación que la referencia: no puede haber cambios
+        if marca_verificada and marca_verificada == obtener_marca_bd(conn, ley):
+            return cambios
 
-        # Detectar eliminados
-        for numero in verificados:
-            if numero not in actuales:
-                cambios['eliminados'].append(numero)
+        for estado, numero in obtener_diferencias_bd(conn, ley, verificados):
+            cambios[estado].append(numero)
 
         return cambios
     finally:
-        conn.close()
+        release_connection(conn)
 
 
-def mostrar_diff(ley: str, numero: str):
-    """Muestra el contenido actual de un artículo para revisión."""
+def mostrar_diff(ley: str, numeros: list[str]):
+    """Muestra el contenido actual de uno o más artículos para revisión."""
     conn = get_connection()
     try:
-        contenido = obtener_contenido_articulo(conn, ley, numero)
-        if contenido:
-            print(f"\n{'='*60}")
-            print(f"Artículo {numero} - {ley}")
-            print('='*60)
-            print(contenido)
-            print('='*60)
-        else:
-            print(f"Artículo {numero} no encontrado en {ley}")
+        contenidos = obtener_contenidos(conn, ley, numeros)
+        for numero in numeros:
+            contenido = contenidos.get(numero)
+            if contenido:
+                print(f"\n{'='*60}")
+                print(f"Artículo {numero} - {ley}")
+                print('='*60)
+                print(contenido)
+                print('='*60)
+            else:
+                print(f"Artículo {numero} no encontrado en {ley}")
     finally:
-        conn.close()
+        release_connection(conn)
 
 
 def main():
+    try:
+        ejecutar()
+    finally:
+        cerrar_conexion()
+
+
+def ejecutar():
     if len(sys.argv) < 3:
         print(__doc__)
         sys.exit(1)
@@ -197,15 +310,26 @@ def main():
                     print(f"    x Art. {num}")
 
             print(f"\nTotal: {total} cambios")
-            print(f"\nPara ver contenido: python backend/etl/checksums.py {ley} --diff <numero>")
+            print(f"\nPara ver contenido: python backend/etl/checksums.py {ley} --diff <numero>[,<numero>...]")
+            if cambios['modificados']:
+                print(f"Para ver todos los modificados: python backend/etl/checksums.py {ley} --diff-modificados")
             print(f"Para aceptar cambios: python backend/etl/checksums.py {ley} --guardar")
 
     elif accion == '--diff':
         if len(sys.argv) < 4:
             print("Falta número de artículo")
             sys.exit(1)
-        numero = sys.argv[3]
-        mostrar_diff(ley, numero)
+        numeros = [n.strip() for n in sys.argv[3].split(',') if n.strip()]
+        mostrar_diff(ley, numeros)
+
+    elif accion == '--diff-modificados':
+        cambios = comparar_checksums(ley)
+        if cambios is None:
+            sys.exit(1)
+        if not cambios['modificados']:
+            print(f"✓ Sin artículos modificados en {ley}")
+        else:
+            mostrar_diff(ley, cambios['modificados'])
 
     else:
         print(f"Acción desconocida: {accion}")
@@ -2,8 +2,25 @@
 Configuración por ley para extracción.
 
 Cada ley tiene sus propios patrones de detección y estructura.
+Los patrones regex se compilan una sola vez al importar el módulo.
 """
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+# Patrones y ruido compartidos por todas las leyes (una sola cadena en memoria)
+_FRACCION = r'^([IVX]+)\.\s+'
+_INCISO = r'^([a-z])\)\s+'
+_NUMERAL = r'^(\d{1,2})\.\s+'
+
+# Encabezado de página común a los PDFs de la Cámara de Diputados
+_RUIDO_COMUN = [
+    'CÁMARA DE DIPUTADOS',
+    'Secretaría General',
+    'Servicios Parlamentarios',
+]
+
 LEYES = {
     "CFF": {
         "nombre": "Código Fiscal de la Federación",
@@ -38,9 +55,9 @@ LEYES = {
             "seccion": r'^Secci[oó]n\s+(Primera|Segunda|Tercera|Cuarta|Quinta|Sexta|Séptima|Octava|Novena|Décima)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Detección de referencias (reformas, adiciones)
@@ -90,9 +107,9 @@ LEYES = {
             "seccion": r'Sección\s+(\d+\.\d+\.\d+)',
 
             # Fracciones dentro de reglas
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
         # RMF usa extraer_rmf.py (no extraer.py), no necesita ruido_lineas
     },
@@ -126,18 +143,16 @@ LEYES = {
             "capitulo": r'^Capítulo\s+([IVX]+|Único)$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
             "apartado": r'^([A-Z])\.\s+',  # Art. 123 tiene Apartado A y B
         },
 
         # Ruido a eliminar (encabezados, pies de página)
         "ruido_lineas": [
             'CONSTITUCIÓN POLÍTICA DE LOS ESTADOS UNIDOS MEXICANOS',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             'TEXTO VIGENTE',
@@ -189,17 +204,15 @@ LEYES = {
             "seccion": r'^SECCI[OÓ]N\s+([IVX]+)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar (encabezados, pies de página)
         "ruido_lineas": [
             'LEY DEL IMPUESTO SOBRE LA RENTA',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             'TEXTO VIGENTE',
@@ -255,24 +268,21 @@ LEYES = {
             # Artículo: "Artículo 1o.", "Artículo 18-A.", "Artículo 18-H QUINTUS."
             "articulo": r'^Artículo\s+(\d+)([oa])?\.?(?:[-–\s]*([A-Z]))?(?:[-–\s]+(Bis|Ter|Quáter|Quintus|Quinquies|Sexies))?\.[- –]?',
 
-            # LIVA no tiene títulos explícitos
-            # LIVA no tiene títulos - usar patrón que nunca matchea pero tiene grupo
-            "titulo": r'^(TITULO_INEXISTENTE)$',
+            # LIVA no tiene títulos explícitos (None = no buscar títulos)
+            "titulo": None,
             # Capítulos (incluyendo "III BIS")
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar (encabezados, pies de página)
         "ruido_lineas": [
             'LEY DEL IMPUESTO AL VALOR AGREGADO',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             'TEXTO VIGENTE',
@@ -328,17 +338,15 @@ LEYES = {
             "seccion": r'^Sección\s+(Primera|Segunda|Tercera|Cuarta|Quinta|Sexta|Séptima|Octava|Novena|Décima)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar (encabezados, pies de página)
         "ruido_lineas": [
             'LEY ADUANERA',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             'TEXTO VIGENTE',
@@ -392,17 +400,15 @@ LEYES = {
             "articulo": r'^Artículo\s+(\d+)([oa])?\.?(?:[-–\s]*([A-ZÑ]|LL))?(?:[-–\s]+(Bis|Ter|Quáter|Quinquies|Sexies))?[-.]?[- –]',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'LEY DEL IMPUESTO ESPECIAL SOBRE PRODUCCIÓN Y SERVICIOS',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             ' de 163',  # Paginación "X de 163"
@@ -454,17 +460,15 @@ LEYES = {
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'LEY FEDERAL DEL TRABAJO',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             ' de 450',  # Paginación "X de 450"
@@ -514,17 +518,15 @@ LEYES = {
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'LEY DEL SEGURO SOCIAL',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
             ' de 178',  # Paginación "X de 178"
@@ -570,17 +572,15 @@ LEYES = {
             "titulo": r'^T[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO|SEPTIMO|OCTAVO)\s*$',
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$',
             "seccion": r'^SECCI[OÓ]N\s+([IVX]+)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'LEY DEL INSTITUTO DEL FONDO NACIONAL DE LA VIVIENDA PARA LOS TRABAJADORES',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
         ],
@@ -624,17 +624,15 @@ LEYES = {
             "titulo": r'^T[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO|SEPTIMO|OCTAVO)\s*$',
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$',
             "seccion": r'^SECCI[OÓ]N\s+([IVX]+)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'LEY DEL INSTITUTO DE SEGURIDAD Y SERVICIOS SOCIALES DE LOS TRABAJADORES DEL ESTADO',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma',
             'Última reforma',
         ],
@@ -685,17 +683,15 @@ LEYES = {
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'REGLAMENTO DEL CÓDIGO FISCAL DE LA FEDERACIÓN',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Nuevo Reglamento DOF',
             ' de 40',  # Paginación "X de 40"
         ],
@@ -731,15 +727,13 @@ LEYES = {
             "articulo": r'^Artículo\s+(\d+)\.\s',
             "titulo": r'^T[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO|S[EÉ]PTIMO|OCTAVO)\s*$',
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+|[UÚ]NICO)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
         "ruido_lineas": [
             'REGLAMENTO DE LA LEY DEL SEGURO SOCIAL EN MATERIA',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma DOF',
             ' de 113',  # Paginación
             'FISCALIZACIÓN',  # Header de página (2da línea del título)
@@ -772,14 +766,12 @@ LEYES = {
         "patrones": {
             "articulo": r'ART[IÍ]CULO\s+(\d+)[oa]?\.-\s',
             "capitulo": r'^CAP[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
         },
         "ruido_lineas": [
             'REGLAMENTO DE LOS ARTÍCULOS 121 Y 122',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             ' de 6',  # Paginación
         ],
         "referencias": {
@@ -804,14 +796,12 @@ LEYES = {
         "patrones": {
             "articulo": r'^Artículo\s+(\d+)\.?\s',
             "capitulo": r'^Cap[íi]tulo\s+([IVX]+)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
         },
         "ruido_lineas": [
             'REGLAMENTO DE LA LEY DEL IMPUESTO ESPECIAL',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             ' de 4',  # Paginación
         ],
         "referencias": {
@@ -836,14 +826,12 @@ LEYES = {
         "patrones": {
             "articulo": r'Artículo\s+(\d+)\.-\s',
             "capitulo": r'^CAP[IÍ]TULO\s+([IVX]+)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
         },
         "ruido_lineas": [
             'REGLAMENTO DE LA LEY DEL SEGURO SOCIAL',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             ' de 6',  # Paginación
         ],
         "referencias": {
@@ -874,17 +862,15 @@ LEYES = {
         "patrones": {
             "articulo": r'^Artículo\s+(\d+)(?:[-–\s]*([A-Z]))?(?:[-–\s]+(Bis|Ter))?\.?\s',
             "capitulo": r'^Cap[íi]tulo\s+([IVX]+)\s*$',
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'REGLAMENTO DE LA LEY DEL IMPUESTO AL VALOR AGREGADO',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma DOF',
             ' de 16',  # Paginación
         ],
@@ -930,17 +916,15 @@ LEYES = {
             "seccion": r'^SECCI[OÓ]N\s+([IVX]+|[UÚ]NICA)\s*$',
 
             # Fracciones dentro de artículos
-            "fraccion": r'^([IVX]+)\.\s+',
-            "inciso": r'^([a-z])\)\s+',
-            "numeral": r'^(\d{1,2})\.\s+',
+            "fraccion": _FRACCION,
+            "inciso": _INCISO,
+            "numeral": _NUMERAL,
         },
 
         # Ruido a eliminar
         "ruido_lineas": [
             'REGLAMENTO DE LA LEY DEL IMPUESTO SOBRE LA RENTA',
-            'CÁMARA DE DIPUTADOS',
-            'Secretaría General',
-            'Servicios Parlamentarios',
+            *_RUIDO_COMUN,
             'Última Reforma DOF',
             ' de 93',  # Paginación
         ],
@@ -963,12 +947,100 @@ LEYES = {
 }
 
 
+# Flags con que los extractores aplican los patrones de detección
+FLAGS_PATRONES = re.IGNORECASE | re.MULTILINE
+
+
+def compilar_ruido(cadenas) -> re.Pattern:
+    """Compila cadenas fijas de ruido en una alternación que detecta cualquiera."""
+    return re.compile("|".join(re.escape(c) for c in cadenas))
+
+
+_METACARACTERES = set('.^$*+?{}[]()|\\')
+
+
+def prefijo_literal(patron: str) -> str:
+    """Prefijo literal (en minúsculas) con que empieza toda coincidencia de un patrón.
+
+    Solo aplica a patrones anclados con ^ y sin alternación de primer nivel;
+    para el resto regresa "" (sin prefiltro). Permite descartar líneas con
+    str.startswith antes de evaluar el regex.
+    """
+    if not patron or not patron.startswith('^'):
+        return ""
+
+    # Una alternación de primer nivel invalida cualquier prefijo
+    nivel = 0
+    en_clase = False
+    escape = False
+    for c in patron:
+        if escape:
+            escape = False
+        elif c == '\\':
+            escape = True
+        elif en_clase:
+            en_clase = c != ']'
+        elif c == '[':
+            en_clase = True
+        elif c == '(':
+            nivel += 1
+        elif c == ')':
+            nivel -= 1
+        elif c == '|' and nivel == 0:
+            return ""
+
+    prefijo = []
+    for c in patron[1:]:
+        if c in _METACARACTERES:
+            # Un cuantificador que admite cero repeticiones hace opcional el último literal
+            if c in '?*{' and prefijo:
+                prefijo.pop()
+            break
+        prefijo.append(c)
+    return ''.join(prefijo).lower()
+
+
+@lru_cache(maxsize=None)
+def _compilar(patron: str, flags: int = 0) -> re.Pattern:
+    """Compila un patrón; patrones idénticos entre leyes comparten el mismo objeto."""
+    return re.compile(patron, flags)
+
+
+def _compilar_patrones(config: dict):
+    """Reemplaza en sitio los patrones regex (str) de una ley por re.Pattern."""
+    if "patrones" in config:
+        config["patrones"] = {
+            nombre: _compilar(patron, FLAGS_PATRONES) if patron is not None else None
+            for nombre, patron in config["patrones"].items()
+        }
+    if "fecha_dof_patron" in config:
+        config["fecha_dof_patron"] = _compilar(config["fecha_dof_patron"])
+    if "fin_articulos_extra" in config:
+        config["fin_articulos_extra"] = [
+            _compilar(p, re.IGNORECASE) for p in config["fin_articulos_extra"]
+        ]
+    if "ruido_lineas" in config:
+        # Una sola alternación: una pasada por línea en vez de una por cadena
+        config["ruido_re"] = compilar_ruido(config["ruido_lineas"])
+    referencias = config.get("referencias")
+    if referencias and "patrones" in referencias:
+        referencias["patrones"] = [_compilar(p) for p in referencias["patrones"]]
+
+
+for _config in LEYES.values():
+    _compilar_patrones(_config)
+
+# Vista de solo lectura: la configuración no debe modificarse en tiempo de ejecución
+LEYES = MappingProxyType(LEYES)
+
+
 def get_config(codigo: str) -> dict:
     """Obtiene la configuración de una ley."""
     codigo = codigo.upper()
-    if codigo not in LEYES:
+    config = LEYES.get(codigo)
+    if config is None:
         raise ValueError(f"Ley '{codigo}' no configurada. Disponibles: {list(LEYES.keys())}")
-    return LEYES[codigo]
+    return config
 
 
 def listar_leyes() -> list:
@@ -9,9 +9,15 @@ Uso:
     python backend/etl/extraer.py CFF
 """
 
+import os
 import re
-import json
 import sys
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
@@ -22,7 +28,8 @@ except ImportError:
     print("Error: pdfplumber no instalado. Ejecuta: pip install pdfplumber")
     sys.exit(1)
 
-from config import get_config, listar_leyes
+from config import get_config, listar_leyes, compilar_ruido
+from archivos_json import escribir_contenido
 
 # Meses en español para parsear fechas DOF
 MESES = {
@@ -68,7 +75,7 @@ def extraer_fecha_dof(pdf, config: dict) -> str | None:
             header_italic = '\n'.join(text.split('\n')[:5])
 
         # Aplicar patrón de config
-        match = re.search(patron_config, header_italic)
+        match = patron_config.search(header_italic)
         if match:
             grupos = match.groups()
             # Patrón numérico: DD-MM-YYYY
@@ -97,10 +104,32 @@ Y_PARAGRAPH_GAP = 12
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
+# Mínimo de artículos para repartir la extracción en procesos
+# (por debajo, arrancar el pool cuesta más de lo que ahorra)
+MIN_ARTICULOS_POOL = 50
+
 # Patrón para detectar sección de transitorios (fin de artículos permanentes)
 # Cubre: TRANSITORIO, TRANSITORIA, TRANSITORIOS, TRANSITORIAS
 _PATRON_TRANSITORIOS = re.compile(r'TRANSITORI[OA]S?', re.IGNORECASE)
 
+# Encabezado de cualquier artículo: marca el fin del artículo anterior
+_PATRON_SIGUIENTE_ARTICULO = re.compile(
+    r'(?:ARTICULO|ARTÍCULO|Artículo)\s+\d+[oa]?(?:[-–_\s]*[A-Z])?'
+    r'(?:[-–_\s]+(?:bis|Bis|Ter|Quáter|Quinquies|Sexies)(?:[-–_\s]+\d+)?)?\.[- –\s]',
+    re.IGNORECASE
+)
+
+# Identificador al inicio de párrafo: fracción romana (I.), inciso (a)) o numeral (1.)
+_PATRON_IDENTIFICADOR = re.compile(
+    r'^(?:(?P<fraccion>[IVXLC]+)\.|(?P<inciso>[a-z])\)|(?P<numeral>\d+)\.)\s*(?P<resto>.*)$'
+)
+
+# Ruido por defecto para leyes sin "ruido_lineas" en config
+_RUIDO_DEFAULT = compilar_ruido([
+    'CÓDIGO FISCAL', 'CÁMARA DE DIPUTADOS', 'Secretaría General',
+    'Servicios Parlamentarios', 'DOF', 'de 375', 'Última Reforma'
+])
+
 
 def es_fin_articulos(texto: str, patrones_extra: list[re.Pattern] = None) -> bool:
     """Detecta si el texto indica fin de artículos permanentes.
@@ -116,7 +145,7 @@ def es_fin_articulos(texto: str, patrones_extra: list[re.Pattern] = None) -> boo
     return False
 
 
-@dataclass
+@dataclass(slots=True)
 class Parrafo:
     """Un párrafo dentro de un artículo."""
     numero: int                     # Orden secuencial: 1, 2, 3...
@@ -145,7 +174,7 @@ class Parrafo:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class Articulo:
     """Un artículo o regla."""
     numero: str                     # "1o", "17-H BIS", "2.1.1.1"
@@ -164,7 +193,7 @@ class Articulo:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Division:
     """Una división estructural (título, capítulo, etc.)."""
     tipo: str                       # 'titulo', 'capitulo', 'seccion', 'libro'
@@ -183,20 +212,75 @@ class Division:
         }
 
 
+@lru_cache(maxsize=4096)
+def _patron_articulo(numero: str) -> re.Pattern:
+    """Encabezado de un artículo concreto ("4o-A" coincide con "4o.-A." del PDF)."""
+    numero_patron = re.escape(numero).replace(r'\-', r'\.?-')
+    # Flexibilizar espacio antes de sufijos (bis/ter/etc) para aceptar guión o espacio
+    numero_patron = re.sub(r'\\ (bis|ter|quáter|quinquies|sexies)', '[-–\\\\s]+\\1', numero_patron, flags=re.IGNORECASE)
+    return re.compile(rf'(?:ARTICULO|ARTÍCULO|Artículo)\s+{numero_patron}\.', re.IGNORECASE)
+
+
+def _numero_articulo(grupos: tuple) -> str:
+    """Número normalizado ("4o-A", "17-H Bis 2") desde los grupos de patrones["articulo"]."""
+    numero_base = grupos[0]
+    ordinal = grupos[1] if len(grupos) > 1 else None
+    letra = grupos[2] if len(grupos) > 2 else None
+    sufijo = grupos[3] if len(grupos) > 3 else None
+    sufijo_num = grupos[4] if len(grupos) > 4 else None
+
+    numero = numero_base
+    if ordinal:
+        numero += ordinal.lower()
+    if letra:
+        numero += f"-{letra.upper()}"
+    if sufijo:
+        numero += f" {sufijo.capitalize()}"
+        if sufijo_num:
+            numero += f" {sufijo_num}"
+    return numero
+
+
+def _tipo_identificador(match: re.Match | None, texto: str) -> tuple:
+    """(tipo, identificador, contenido) de un match de _PATRON_IDENTIFICADOR.
+
+    El match puede venir de un prefijo de texto (la primera línea física
+    de un párrafo consolidado): el contenido se toma de texto desde el
+    inicio de 'resto'.
+    """
+    if not match:
+        return ('texto', None, texto)
+    contenido = texto[match.start('resto'):]
+    if match['fraccion']:
+        return ('fraccion', match['fraccion'], contenido)
+    if match['inciso']:
+        return ('inciso', match['inciso'] + ')', contenido)
+    return ('numeral', match['numeral'] + '.', contenido)
+
+
 class Extractor:
     """Extractor genérico de leyes usando coordenadas X/Y."""
 
-    def __init__(self, codigo: str):
+    def __init__(self, codigo: str, workers: int | None = None):
         self.codigo = codigo.upper()
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
         self.config = get_config(self.codigo)
         self.pdf_path = BASE_DIR / self.config["pdf_path"]
         self.pdf = None
 
-        # Compilar patrones extra para detectar fin de artículos
-        self._fin_articulos_extra = [
-            re.compile(p, re.IGNORECASE)
-            for p in self.config.get("fin_articulos_extra", [])
-        ]
+        # Caché por índice de página: cada página se procesa con pdfplumber una sola vez
+        self._lineas_cache: dict[int, list[dict]] = {}
+        self._texto_cache: dict[int, str] = {}
+
+        # Patrones extra para detectar fin de artículos (compilados en config)
+        self._fin_articulos_extra = self.config.get("fin_articulos_extra", [])
+        # Criterios de fuente de referencias (ver _es_referencia), leídos una sola vez
+        # Sin config de referencias, itálica/color/tamaño de cada línea no se usan
+        config_ref = self.config.get("referencias") or {}
+        self._con_referencias = bool(config_ref)
+        self._ref_requiere_italic = config_ref.get('font_italic', False)
+        self._ref_requiere_color = config_ref.get('color_no_negro', False)
+        self._ref_size_max = config_ref.get('size_max', 10)
 
     def abrir_pdf(self):
         """Abre el PDF."""
@@ -216,24 +300,17 @@ class Extractor:
         chars = page.chars
 
         # Agrupar chars por línea para detectar propiedades de fuente
-        chars_por_y = {}
+        chars_por_y = defaultdict(list)
         for c in chars:
-            y_key = round(c['top'] / 5) * 5
-            if y_key not in chars_por_y:
-                chars_por_y[y_key] = []
-            chars_por_y[y_key].append(c)
-
-        # Agrupar words por línea (mismo Y aproximado)
-        lines = {}
-        for w in words:
-            y_key = round(w['top'] / 5) * 5
-            if y_key not in lines:
-                lines[y_key] = []
-            lines[y_key].append(w)
+            chars_por_y[round(c['top'] / 5) * 5].append(c)
+
+        # Agrupar words por línea (mismo Y aproximado): un solo sort por (y_key, x0)
+        # y cortes donde cambia y_key, sin construir un dict de listas
+        claves = sorted(((round(w['top'] / 5) * 5, w['x0'], i) for i, w in enumerate(words)))
 
         result = []
-        for y_key in sorted(lines.keys()):
-            line_words = sorted(lines[y_key], key=lambda w: w['x0'])
+        for y_key, grupo in groupby(claves, key=itemgetter(0)):
+            line_words = [words[i] for _, _, i in grupo]
             x0 = round(line_words[0]['x0'])
             x1 = round(line_words[-1]['x1'])  # x_end para detectar justificación
             text = ' '.join(w['text'] for w in line_words).strip()
@@ -247,18 +324,28 @@ class Extractor:
                 font_size = 12  # default
 
                 if line_chars:
-                    # Buscar chars con x >= x0 (de esta línea)
-                    relevant_chars = [c for c in line_chars if c['x0'] >= x0 - 5]
-                    if relevant_chars:
-                        first_char = relevant_chars[0]
+                    # Chars con x >= x0 (de esta línea), en una sola pasada sin listas
+                    # intermedias: el primero da la fuente; is_bold = True solo si
+                    # TODOS los caracteres no blancos son bold
+                    first_char = None
+                    hay_texto = False
+                    todos_bold = True
+                    for c in line_chars:
+                        if c['x0'] < x0 - 5:
+                            continue
+                        if first_char is None:
+                            first_char = c
+                        if c['text'].strip():
+                            hay_texto = True
+                            fontname = c.get('fontname', '')
+                            if 'Bold' not in fontname and 'bold' not in fontname:
+                                todos_bold = False
+                                break  # first_char ya quedó fijado
+                    is_bold = hay_texto and todos_bold
+                    # Itálica, tamaño y color solo los usa _es_referencia
+                    if first_char is not None and self._con_referencias:
                         fontname = first_char.get('fontname', '')
                         is_italic = 'Italic' in fontname or 'italic' in fontname
-                        # is_bold = True solo si TODOS los caracteres son bold
-                        non_space_chars = [c for c in relevant_chars if c['text'].strip()]
-                        is_bold = bool(non_space_chars) and all(
-                            'Bold' in c.get('fontname', '') or 'bold' in c.get('fontname', '')
-                            for c in non_space_chars
-                        )
                         font_size = first_char.get('size', 12)
                         color = first_char.get('non_stroking_color', ())
                         # Detectar si el color NO es negro puro
@@ -276,6 +363,30 @@ class Extractor:
 
         return result
 
+    def _lineas_pagina(self, pag_num: int) -> list[dict]:
+        """Líneas de una página (ver _extraer_lineas_pagina), con caché por página.
+
+        Las líneas en caché se comparten entre artículos: no modificarlas.
+        Cada línea trae 'es_ruido' (ruido_lineas de la ley), evaluado una sola
+        vez por página aunque varios artículos la recorran.
+        """
+        lineas = self._lineas_cache.get(pag_num)
+        if lineas is None:
+            lineas = self._extraer_lineas_pagina(self.pdf.pages[pag_num])
+            ruido = self.config.get("ruido_re", _RUIDO_DEFAULT)
+            for linea in lineas:
+                linea['es_ruido'] = ruido.search(linea['text']) is not None
+            self._lineas_cache[pag_num] = lineas
+        return lineas
+
+    def _texto_pagina(self, pag_num: int) -> str:
+        """Texto plano de una página (extract_text), con caché por página."""
+        texto = self._texto_cache.get(pag_num)
+        if texto is None:
+            texto = self.pdf.pages[pag_num].extract_text() or ""
+            self._texto_cache[pag_num] = texto
+        return texto
+
     def _es_referencia(self, linea: dict) -> bool:
         """Determina si una línea es referencia basándose en config.
 
@@ -283,20 +394,17 @@ class Extractor:
         Si cumple los 3 criterios de fuente, ES referencia.
         Los patrones son opcionales (para casos que no cumplan todos los criterios).
         """
-        config_ref = self.config.get("referencias")
-        if not config_ref:
+        if not self._con_referencias:
             return False
 
-        text = linea['text']
         is_italic = linea.get('is_italic', False)
         is_non_black = linea.get('is_non_black', False)
         font_size = linea.get('font_size', 12)
-        size_max = config_ref.get('size_max', 10)
 
         # Si cumple TODOS los criterios de fuente, es referencia
-        cumple_italic = not config_ref.get('font_italic', False) or is_italic
-        cumple_color = not config_ref.get('color_no_negro', False) or is_non_black
-        cumple_size = font_size <= size_max
+        cumple_italic = not self._ref_requiere_italic or is_italic
+        cumple_color = not self._ref_requiere_color or is_non_black
+        cumple_size = font_size <= self._ref_size_max
 
         if cumple_italic and cumple_color and cumple_size:
             return True
@@ -304,25 +412,8 @@ class Extractor:
         return False
 
     def _detectar_tipo_identificador(self, texto: str) -> tuple:
-        """Detecta tipo de elemento y extrae identificador."""
-        texto = texto.strip()
-
-        # Fracción romana
-        match = re.match(r'^([IVXLC]+)\.\s*(.*)$', texto)
-        if match:
-            return ('fraccion', match.group(1), match.group(2))
-
-        # Inciso
-        match = re.match(r'^([a-z])\)\s*(.*)$', texto)
-        if match:
-            return ('inciso', match.group(1) + ')', match.group(2))
-
-        # Numeral
-        match = re.match(r'^(\d+)\.\s*(.*)$', texto)
-        if match:
-            return ('numeral', match.group(1) + '.', match.group(2))
-
-        return ('texto', None, texto)
+        """Detecta tipo de elemento y extrae identificador (texto ya sin espacios en los extremos)."""
+        return _tipo_identificador(_PATRON_IDENTIFICADOR.match(texto), texto)
 
     def _consolidar_lineas(self, lineas: list[dict]) -> list[dict]:
         """Consolida líneas físicas en párrafos lógicos usando 5 reglas.
@@ -346,33 +437,45 @@ class Extractor:
         Y_GAP_NORMAL = 15   # Espaciado normal entre líneas
 
         lineas_consolidadas = []
-        buffer_texto = ""
+        # Líneas físicas del párrafo en curso; se unen con ' ' al cerrarlo
+        # (evita concatenar cadenas cada vez más largas)
+        buffer_partes = []
         buffer_x = None
         buffer_y = None
         buffer_y_fin = None  # Y de la última línea del párrafo
         buffer_x_end = None
+        buffer_termina_punto = False  # el texto acumulado termina en '.', sin recorrerlo
+        buffer_identificador = None  # Match de _PATRON_IDENTIFICADOR de la primera línea
 
         for linea in lineas:
             x = linea['x']
             x_end = linea.get('x_end', 544)
             y = linea.get('y_global', linea['y'])  # Usar y_global si existe
             text = linea['text']
+            text_limpio = text.strip()
+            # Una línea en blanco no cambia el final del buffer
+            termina_punto = text_limpio.endswith('.') if text_limpio else buffer_termina_punto
 
             # Si tiene identificador (I., a), 1.) → siempre nuevo párrafo
-            _, identificador, _ = self._detectar_tipo_identificador(text)
-            if identificador:
-                if buffer_texto:
-                    lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': buffer_texto})
-                buffer_texto = text
+            match_id = _PATRON_IDENTIFICADOR.match(text_limpio)
+            if match_id:
+                if buffer_partes:
+                    lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': ' '.join(buffer_partes),
+                                                'identificador': buffer_identificador})
+                buffer_partes = [text]
+                buffer_termina_punto = termina_punto
+                buffer_identificador = match_id
                 buffer_x = x
                 buffer_y = y
                 buffer_y_fin = y
                 buffer_x_end = x_end
                 continue
 
-            if not buffer_texto:
+            if not buffer_partes:
                 # Primera línea
-                buffer_texto = text
+                buffer_partes = [text]
+                buffer_termina_punto = termina_punto
+                buffer_identificador = None
                 buffer_x = x
                 buffer_y = y
                 buffer_y_fin = y
@@ -399,33 +502,36 @@ class Extractor:
                 puntos += 1
 
             # Regla 4: Empieza con mayúscula
-            primer_char = text.strip()[0] if text.strip() else ''
-            empieza_mayuscula = primer_char.isupper()
+            empieza_mayuscula = text_limpio[:1].isupper()
             if empieza_mayuscula:
                 puntos += 1
 
             # Regla 5: Línea anterior termina con "."
-            anterior_termina_punto = buffer_texto.rstrip().endswith('.')
-            if anterior_termina_punto:
+            if buffer_termina_punto:
                 puntos += 1
 
+            buffer_termina_punto = termina_punto
+
             # Decisión: 4+ reglas = nuevo párrafo
             if puntos >= 4:
-                lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': buffer_texto})
-                buffer_texto = text
+                lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': ' '.join(buffer_partes),
+                                            'identificador': buffer_identificador})
+                buffer_partes = [text]
+                buffer_identificador = None
                 buffer_x = x
                 buffer_y = y
                 buffer_y_fin = y
                 buffer_x_end = x_end
             else:
                 # Continuación del párrafo actual
-                buffer_texto += " " + text
+                buffer_partes.append(text)
                 buffer_y = y
                 buffer_y_fin = y  # Actualizar Y final
                 buffer_x_end = x_end
 
-        if buffer_texto:
-            lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': buffer_texto})
+        if buffer_partes:
+            lineas_consolidadas.append({'x': buffer_x, 'y_fin': buffer_y_fin, 'text': ' '.join(buffer_partes),
+                                        'identificador': buffer_identificador})
 
         return lineas_consolidadas
 
@@ -433,25 +539,31 @@ class Extractor:
         """Construye párrafos con jerarquía desde líneas consolidadas."""
         parrafos = []
         numero = 0
-        ultimo_por_x = {}
+        # Último párrafo por X (redondeado a decenas), como listas paralelas
+        # ordenadas por X: al agregar un X se descartan los mayores
+        x_keys = []
+        x_numeros = []
 
         def encontrar_padre_por_x(x_actual: int) -> Optional[int]:
-            candidatos = [(x_key, num) for x_key, num in ultimo_por_x.items()
-                          if x_key < x_actual - X_TOLERANCE]
-            if not candidatos:
-                return None
-            candidatos.sort(key=lambda t: t[0], reverse=True)
-            return candidatos[0][1]
+            """Párrafo con el mayor X menor que x_actual - X_TOLERANCE."""
+            i = bisect_left(x_keys, x_actual - X_TOLERANCE)
+            return x_numeros[i - 1] if i > 0 else None
 
         for linea in lineas_consolidadas:
-            x, text = linea['x'], linea['text']
-            if not text.strip():
+            x, text = linea['x'], linea['text'].strip()
+            if not text:
                 continue
 
-            tipo, identificador, contenido = self._detectar_tipo_identificador(text)
+            # El identificador se detectó en _consolidar_lineas sobre la primera línea
+            # física; una línea que no lo tenía tampoco lo tiene al consolidarse.
+            # Sin identificador, contenido es el texto completo (ya sin espacios en los extremos)
+            if 'identificador' in linea:
+                tipo, identificador, contenido = _tipo_identificador(linea['identificador'], text)
+            else:
+                tipo, identificador, contenido = self._detectar_tipo_identificador(text)
 
             # Normalizar espacios múltiples
-            contenido_limpio = ' '.join((contenido if identificador else text).split())
+            contenido_limpio = ' '.join(contenido.split())
 
             # Determinar padre
             if tipo == 'fraccion':
@@ -479,8 +591,10 @@ class Extractor:
 
             # Actualizar tracking
             x_key = round(x / 10) * 10
-            ultimo_por_x[x_key] = numero
-            ultimo_por_x = {k: v for k, v in ultimo_por_x.items() if k <= x_key}
+            pos = bisect_left(x_keys, x_key)
+            del x_keys[pos:], x_numeros[pos:]
+            x_keys.append(x_key)
+            x_numeros.append(numero)
 
         return parrafos
 
@@ -490,17 +604,14 @@ class Extractor:
         todas_lineas = []
         referencias = []  # Lista de (y_global, texto_referencia)
         en_articulo = False
-        ruido = self.config.get("ruido_lineas", [
-            'CÓDIGO FISCAL', 'CÁMARA DE DIPUTADOS', 'Secretaría General',
-            'Servicios Parlamentarios', 'DOF', 'de 375', 'Última Reforma'
-        ])
 
         for pag_num in range(pag_inicio, pag_fin + 1):
-            lineas = self._extraer_lineas_pagina(self.pdf.pages[pag_num])
+            lineas = self._lineas_pagina(pag_num)
             # Offset Y por página (800 unidades por página aprox)
             y_offset = (pag_num - pag_inicio) * 800
 
             for linea in lineas:
+                linea = dict(linea)  # Copia: la caché se comparte con otros artículos
                 text = linea['text']
                 # Y global para comparaciones entre páginas
                 y_global = linea['y'] + y_offset
@@ -514,7 +625,7 @@ class Extractor:
                     continue
 
                 # Filtrar ruido (después de detectar referencias)
-                if any(skip in text for skip in ruido):
+                if linea['es_ruido']:
                     continue
 
                 # Detectar sección TRANSITORIOS o fin de artículos (termina extracción)
@@ -560,58 +671,31 @@ class Extractor:
         # Asociar referencias a párrafos
         # Cada referencia se asocia al párrafo cuyo y_fin es menor y más cercano a ref_y
         if referencias and parrafos and len(parrafos) == len(lineas_consolidadas):
+            # Índices de párrafo ordenados por y_fin; con y_fin empatado, el de menor
+            # índice queda al final del empate (es el que gana, como en un recorrido lineal)
+            y_fins = [linea_cons.get('y_fin', 0) for linea_cons in lineas_consolidadas]
+            orden_y = sorted((idx for idx in range(len(y_fins)) if y_fins[idx] > -1),
+                             key=lambda idx: (y_fins[idx], -idx))
+            y_ordenados = [y_fins[idx] for idx in orden_y]
             for ref_y, ref_texto in referencias:
-                # Encontrar el párrafo con mayor y_fin que sea menor que ref_y
-                mejor_idx = -1
-                mejor_y = -1
-                for idx, linea_cons in enumerate(lineas_consolidadas):
-                    y_fin = linea_cons.get('y_fin', 0)
-                    if y_fin < ref_y and y_fin > mejor_y:
-                        mejor_y = y_fin
-                        mejor_idx = idx
-
-                if mejor_idx >= 0:
-                    p = parrafos[mejor_idx]
+                # Párrafo con mayor y_fin que sea menor que ref_y
+                pos = bisect_left(y_ordenados, ref_y)
+                if pos > 0:
+                    p = parrafos[orden_y[pos - 1]]
                     if p.referencias is None:
                         p.referencias = []
                     p.referencias.append(ref_texto)
 
         return parrafos
 
-    def _encontrar_pagina_articulo(self, numero: str) -> tuple:
-        """Encuentra página inicial y final de un artículo."""
-        patron = re.compile(rf'Artículo\s+{re.escape(numero)}\.', re.IGNORECASE)
-        patron_sig = re.compile(r'Artículo\s+\d+[o]?(?:\.-[A-Z])?(?:-[A-Z])?(?:\s+[A-Z][a-z]+)?\.', re.IGNORECASE)
-
-        pag_inicio = None
-        for i, page in enumerate(self.pdf.pages):
-            text = page.extract_text() or ""
-            if patron.search(text):
-                pag_inicio = i
-                break
-
-        if pag_inicio is None:
-            return None, None
-
-        pag_fin = pag_inicio
-        for i in range(pag_inicio + 1, min(pag_inicio + 10, len(self.pdf.pages))):
-            text = self.pdf.pages[i].extract_text() or ""
-            text_sin_actual = patron.sub('', text)
-            if patron_sig.search(text_sin_actual):
-                pag_fin = i
-                break
-            pag_fin = i
-
-        return pag_inicio, pag_fin
-
     def extraer_contenido(self) -> list[Articulo]:
         """Extrae artículos/reglas con sus párrafos usando coordenadas X/Y."""
         articulos = []
         tipo_contenido = self.config["tipo_contenido"]
 
         # Primero, encontrar todos los artículos escaneando el PDF
-        patron_art = re.compile(self.config["patrones"]["articulo"], re.IGNORECASE | re.MULTILINE)
-        patron_siguiente = re.compile(r'(?:ARTICULO|ARTÍCULO|Artículo)\s+\d+[oa]?(?:[-–_\s]*[A-Z])?(?:[-–_\s]+(?:bis|Bis|Ter|Quáter|Quinquies|Sexies)(?:[-–_\s]+\d+)?)?\.[- –\s]', re.IGNORECASE)
+        patron_art = self.config["patrones"]["articulo"]
+        patron_siguiente = _PATRON_SIGUIENTE_ARTICULO
 
         # Función para encontrar números de artículos cuyo "Artículo" está en bold
         # y en la coordenada X correcta (margen izquierdo ~85)
@@ -641,23 +725,7 @@ class Extractor:
                         # Aplicar patrón para extraer número
                         match = patron_art.match(texto)
                         if match:
-                            grupos = match.groups()
-                            numero_base = grupos[0]
-                            ordinal = grupos[1] if len(grupos) > 1 else None
-                            letra = grupos[2] if len(grupos) > 2 else None
-                            sufijo = grupos[3] if len(grupos) > 3 else None
-                            sufijo_num = grupos[4] if len(grupos) > 4 else None
-
-                            numero = numero_base
-                            if ordinal:
-                                numero += ordinal.lower()
-                            if letra:
-                                numero += f"-{letra.upper()}"
-                            if sufijo:
-                                numero += f" {sufijo.capitalize()}"
-                                if sufijo_num:
-                                    numero += f" {sufijo_num}"
-
+                            numero = _numero_articulo(match.groups())
                             if numero not in vistos:
                                 vistos.add(numero)
                                 articulos_bold.append(numero)
@@ -666,7 +734,7 @@ class Extractor:
             return articulos_bold
 
         # Función para detectar si una página contiene fin de artículos (TRANSITORIO u otro patrón)
-        def pagina_tiene_fin_articulos(page) -> bool:
+        def pagina_tiene_fin_articulos(pag_num: int, page) -> bool:
             """Detecta si la página tiene indicador de fin de artículos (bold, centrado)."""
             chars = page.chars
             if not chars:
@@ -686,7 +754,7 @@ class Extractor:
 
             # Buscar patrones extra en líneas bold
             if self._fin_articulos_extra:
-                lineas = self._extraer_lineas_pagina(page)
+                lineas = self._lineas_pagina(pag_num)
                 for linea in lineas:
                     if linea.get('is_bold'):
                         for patron in self._fin_articulos_extra:
@@ -696,8 +764,13 @@ class Extractor:
             return False
 
         # Escanear todas las páginas para encontrar artículos
-        articulos_encontrados = []
+        # numero -> página de su primera aparición (el dict conserva el orden de
+        # inserción y setdefault no pisa la primera página: deduplica en el mismo recorrido)
+        primera_pagina = {}
         pdf_tiene_chars = any(page.chars for page in self.pdf.pages[:5])  # Verificar primeras 5 páginas
+        # En modo secuencial se extraen las líneas en el mismo recorrido, mientras
+        # la página está parseada; luego se libera. Con pool, cada worker las extrae.
+        precargar_lineas = self.workers <= 1
 
         for i, page in enumerate(self.pdf.pages):
             # Obtener artículos en bold de esta página PRIMERO
@@ -706,49 +779,34 @@ class Extractor:
             # Si encontramos artículos en bold, usar esos
             if articulos_bold:
                 for numero in articulos_bold:
-                    articulos_encontrados.append((numero, i))
+                    primera_pagina.setdefault(numero, i)
             elif not pdf_tiene_chars:
                 # Fallback: usar patrón en texto SOLO para PDFs sin info de fuentes
-                text = page.extract_text() or ""
+                text = self._texto_pagina(i)
                 for match in patron_art.finditer(text):
-                    grupos = match.groups()
-                    numero_base = grupos[0]
-                    ordinal = grupos[1] if len(grupos) > 1 else None
-                    letra = grupos[2] if len(grupos) > 2 else None
-                    sufijo = grupos[3] if len(grupos) > 3 else None
-                    sufijo_num = grupos[4] if len(grupos) > 4 else None
-
-                    numero = numero_base
-                    if ordinal:
-                        numero += ordinal.lower()
-                    if letra:
-                        numero += f"-{letra.upper()}"
-                    if sufijo:
-                        numero += f" {sufijo.capitalize()}"
-                        if sufijo_num:
-                            numero += f" {sufijo_num}"
-
-                    articulos_encontrados.append((numero, i))
+                    primera_pagina.setdefault(_numero_articulo(match.groups()), i)
             # Si no hay bold y el PDF tiene chars, no agregar nada (página sin artículos nuevos)
 
+            # Desde el primer artículo, toda página puede pertenecer a alguno
+            if precargar_lineas and primera_pagina:
+                self._lineas_pagina(i)
+
             # Detectar fin de artículos (sección TRANSITORIOS) - DESPUÉS de procesar la página
-            if pagina_tiene_fin_articulos(page):
+            fin = pagina_tiene_fin_articulos(i, page)
+            if precargar_lineas:
+                page.close()  # Libera chars/objetos parseados; las líneas quedan en caché
+            if fin:
                 pagina_transitorios = i  # Guardar página donde inician TRANSITORIOS
                 break  # Dejar de buscar más artículos en páginas siguientes
         else:
             pagina_transitorios = None  # No se encontró sección TRANSITORIOS
 
-        # Eliminar duplicados manteniendo primera aparición
-        numeros_vistos = set()
-        articulos_unicos = []
-        for numero, pagina in articulos_encontrados:
-            if numero not in numeros_vistos:
-                numeros_vistos.add(numero)
-                articulos_unicos.append((numero, pagina))
+        articulos_unicos = list(primera_pagina.items())
 
         print(f"   Encontrados {len(articulos_unicos)} {tipo_contenido}s")
 
-        # Extraer cada artículo
+        # Preparar un rango de páginas y patrón por artículo
+        tareas = []
         for idx, (numero, pag_inicio) in enumerate(articulos_unicos):
             # Determinar página fin
             if idx + 1 < len(articulos_unicos):
@@ -761,15 +819,21 @@ class Extractor:
                     pag_fin = min(pag_inicio + 5, len(self.pdf.pages) - 1)
 
             # Patrón específico para este artículo
-            # Convertir "4o-A" a patrón que coincida con "4o.-A.-" del PDF
-            numero_patron = re.escape(numero).replace(r'\-', r'\.?-')
-            # Flexibilizar espacio antes de sufijos (bis/ter/etc) para aceptar guión o espacio
-            numero_patron = re.sub(r'\\ (bis|ter|quáter|quinquies|sexies)', '[-–\\\\s]+\\1', numero_patron, flags=re.IGNORECASE)
-            patron_este = re.compile(rf'(?:ARTICULO|ARTÍCULO|Artículo)\s+{numero_patron}\.', re.IGNORECASE)
+            patron_este = _patron_articulo(numero)
 
-            # Extraer párrafos
-            parrafos = self._extraer_parrafos_articulo(pag_inicio, pag_fin, patron_este, patron_siguiente)
+            tareas.append((pag_inicio, pag_fin, patron_este, patron_siguiente))
 
+        # Extraer párrafos (cada artículo es independiente: se reparte en procesos)
+        if self.workers > 1 and len(tareas) >= MIN_ARTICULOS_POOL:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_iniciar_worker,
+                                     initargs=(self.codigo,)) as ex:
+                # chunksize agrupa artículos contiguos: comparten páginas en la caché del worker
+                chunksize = max(1, len(tareas) // (self.workers * 4))
+                resultados = list(ex.map(_extraer_parrafos_worker, tareas, chunksize=chunksize))
+        else:
+            resultados = [self._extraer_parrafos_articulo(*tarea) for tarea in tareas]
+
+        for (numero, pag_inicio), parrafos in zip(articulos_unicos, resultados):
             articulo = Articulo(
                 numero=numero,
                 tipo=tipo_contenido,
@@ -782,6 +846,22 @@ class Extractor:
         return articulos
 
 
+# Extractor de cada proceso del pool (ver Extractor.extraer_contenido)
+_extractor_worker = None
+
+
+def _iniciar_worker(codigo: str):
+    """Abre el PDF una sola vez por proceso del pool."""
+    global _extractor_worker
+    _extractor_worker = Extractor(codigo, workers=1)
+    _extractor_worker.pdf = pdfplumber.open(str(_extractor_worker.pdf_path))
+
+
+def _extraer_parrafos_worker(tarea: tuple) -> list[Parrafo]:
+    """Extrae los párrafos de un artículo en un proceso del pool."""
+    return _extractor_worker._extraer_parrafos_articulo(*tarea)
+
+
 def main():
     if len(sys.argv) < 2:
         print("Uso: python backend/etl/extraer.py <CODIGO>")
@@ -857,13 +937,12 @@ def main():
         "_generado_por": "extraer.py",
         "ley": codigo,
         "tipo_contenido": config["tipo_contenido"],
-        "articulos": [a.to_dict() for a in articulos]
+        "articulos": []  # Se escriben uno a uno en escribir_contenido
     }
     if fecha_dof:
         contenido["ultima_reforma_dof"] = fecha_dof
 
-    with open(contenido_path, 'w', encoding='utf-8') as f:
-        json.dump(contenido, f, ensure_ascii=False, indent=2)
+    escribir_contenido(contenido_path, contenido, (a.to_dict() for a in articulos))
     print(f"   Guardado: {contenido_path.name}")
 
     extractor.cerrar_pdf()
@@ -12,6 +12,7 @@ Uso:
 import re
 import json
 import sys
+from bisect import bisect_right
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
@@ -22,30 +23,45 @@ except ImportError:
     print("Error: PyMuPDF no instalado. Ejecuta: pip install pymupdf")
     sys.exit(1)
 
-from config import get_config
+from config import get_config, prefijo_literal
+from archivos_json import escribir_json
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
+# Defaults de divisiones (si la config de la ley no trae el patrón)
+PATRON_TITULO = re.compile(r'^T[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO|S[EÉ]PTIMO|OCTAVO|NOVENO|D[EÉ]CIMO|[IVX]+)\s*$', re.IGNORECASE)
+PATRON_CAPITULO = re.compile(r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$', re.IGNORECASE)
+PATRON_SECCION = re.compile(r'^SECCI[OÓ]N\s+([IVX]+)\s*$', re.IGNORECASE)
+# Ruido: encabezados, pies de página, números de página (SALTAR)
+PATRON_RUIDO = re.compile(r'^(LEY\s|CÁMARA|Secretaría|Últim|CÓDIGO|CONSTITUCIÓN|\d+\s+de\s+\d+|\[)', re.IGNORECASE)
+# No es nombre de división: artículos, capítulos, títulos, secciones, fracciones
+PATRON_NO_NOMBRE = re.compile(r'^(ART|CAP|TITULO|TÍTULO|SECC|[IVX]+\.\s|[a-z]\)\s)', re.IGNORECASE)
 
-def obtener_coordenada_y(page, patron: str) -> float:
+
+def leer_lineas(page) -> list[tuple[str, float]]:
+    """Líneas de la página como (texto, coordenada Y superior), en orden de lectura."""
+    return [
+        ("".join([span["text"] for span in line["spans"]]), line["bbox"][1])
+        for block in page.get_text("dict")["blocks"]
+        if "lines" in block
+        for line in block["lines"]
+    ]
+
+
+def obtener_coordenada_y(lineas: list[tuple[str, float]], patron: re.Pattern) -> float:
     """
-    Obtiene la coordenada Y de un texto en la página usando el patrón regex.
+    Obtiene la coordenada Y de un texto en la página usando el patrón regex
+    (compilado con re.IGNORECASE) sobre las líneas de leer_lineas.
     Retorna la coordenada Y del bbox (posición vertical) o 99999 si no encuentra.
     """
-    blocks = page.get_text("dict")["blocks"]
-
-    for block in blocks:
-        if "lines" not in block:
-            continue
-        for line in block["lines"]:
-            texto_linea = "".join([span["text"] for span in line["spans"]])
-            if re.search(patron, texto_linea, re.IGNORECASE):
-                return line["bbox"][1]  # coordenada Y superior
+    for texto_linea, y in lineas:
+        if patron.search(texto_linea):
+            return y  # coordenada Y superior
 
     return 99999.0  # No encontrado, poner al final
 
 
-@dataclass
+@dataclass(slots=True)
 class ArticuloRef:
     """Referencia a un artículo."""
     numero: str
@@ -53,7 +69,7 @@ class ArticuloRef:
     derogado: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class SeccionRef:
     """Referencia a una sección dentro de capítulo."""
     numero: str
@@ -62,7 +78,7 @@ class SeccionRef:
     articulos: list[ArticuloRef] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class CapituloRef:
     """Referencia a un capítulo."""
     numero: str
@@ -72,7 +88,7 @@ class CapituloRef:
     secciones: list[SeccionRef] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TituloRef:
     """Referencia a un título."""
     numero: str
@@ -144,28 +160,52 @@ def extraer_articulos_outline(doc, transitorios_marcador: str = "TRANSITORIOS")
     return articulos
 
 
-def marcar_derogados(doc, articulos: list[ArticuloRef]) -> None:
+def leer_textos(doc, hasta: int) -> list[str]:
+    """
+    Lee una sola vez el texto de las primeras `hasta` páginas.
+
+    Derogados y estructura recorren la misma lista en lugar de volver a
+    pedir a MuPDF el texto de una página en cada pasada.
+    """
+    return [doc[i].get_text() for i in range(min(hasta, len(doc)))]
+
+
+def marcar_derogados(textos: list[str], articulos: list[ArticuloRef]) -> None:
     """
     Detecta y marca artículos derogados leyendo el texto del PDF.
     Modifica los artículos in-place, marcando art.derogado = True.
+
+    Args:
+        textos: Texto de cada página (ver leer_textos)
+        articulos: Artículos del outline
     """
+    # Por página: ¿aparece "deroga"? Sin eso ningún artículo de la página está
+    # derogado ("se deroga" y "(derogado)" lo contienen, y al unir líneas con
+    # espacio no puede aparecer una palabra que no estuviera ya en el texto)
+    con_deroga = {}
+
     for art in articulos:
-        # Leer texto de la página del artículo
+        # Texto de la página del artículo
         page_idx = art.pagina - 1
-        if page_idx < 0 or page_idx >= len(doc):
+        if page_idx < 0 or page_idx >= len(textos):
             continue
 
-        texto = doc[page_idx].get_text()
+        texto = textos[page_idx]
+        if page_idx not in con_deroga:
+            con_deroga[page_idx] = 'deroga' in texto.lower()
+        if not con_deroga[page_idx]:
+            continue
 
         # Buscar línea del artículo
         lineas = texto.split('\n')
 
+        # Normalizar número para comparación
+        buscado = 'Artículo' + art.numero.replace('-', '').replace(' ', '')
+
         for i, linea in enumerate(lineas):
-            # Normalizar número para comparación
-            num_buscar = art.numero.replace('-', '').replace(' ', '')
             linea_norm = linea.replace('-', '').replace(' ', '').replace('.', '')
 
-            if f'Artículo{num_buscar}' in linea_norm or f'Artículo{num_buscar}' in linea_norm.replace('_', ''):
+            if buscado in linea_norm or buscado in linea_norm.replace('_', ''):
                 # Revisar esta línea y las siguientes
                 texto_cercano = ' '.join(lineas[i:i+3]).lower()
                 if 'se deroga' in texto_cercano or '(derogado)' in texto_cercano:
@@ -173,12 +213,12 @@ def marcar_derogados(doc, articulos: list[ArticuloRef]) -> None:
                     break
 
 
-def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[TituloRef]:
+def extraer_estructura(textos: list[str], config: dict, pagina_fin: int = None) -> list[TituloRef]:
     """
     Extrae estructura jerárquica (Títulos/Capítulos/Secciones) del texto del PDF.
 
     Args:
-        doc: Documento PyMuPDF
+        textos: Texto de cada página (ver leer_textos)
         config: Configuración de la ley (contiene patrones)
         pagina_fin: Página donde termina el contenido (opcional, 1-indexed)
     """
@@ -186,25 +226,35 @@ def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[Titulo
     titulo_actual = None
     capitulo_actual = None
 
-    # Patrones desde config, con defaults
+    # Patrones desde config, con defaults (None en config = la ley no tiene esa división)
     patrones = config.get("patrones", {})
-    patron_titulo = patrones.get("titulo", r'^T[IÍ]TULO\s+(PRIMERO|SEGUNDO|TERCERO|CUARTO|QUINTO|SEXTO|S[EÉ]PTIMO|OCTAVO|NOVENO|D[EÉ]CIMO|[IVX]+)\s*$')
-    patron_capitulo = patrones.get("capitulo", r'^CAP[IÍ]TULO\s+([IVX]+(?:\s+BIS)?|[UÚ]NICO)\s*$')
-    patron_seccion = patrones.get("seccion", r'^SECCI[OÓ]N\s+([IVX]+)\s*$')
-    # Ruido: encabezados, pies de página, números de página (SALTAR)
-    patron_ruido = r'^(LEY\s|CÁMARA|Secretaría|Últim|CÓDIGO|CONSTITUCIÓN|\d+\s+de\s+\d+|\[)'
-    # No es nombre de división: artículos, capítulos, títulos, secciones, fracciones
-    patron_no_nombre = r'^(ART|CAP|TITULO|TÍTULO|SECC|[IVX]+\.\s|[a-z]\)\s)'
+    patron_titulo = patrones.get("titulo", PATRON_TITULO)
+    patron_capitulo = patrones.get("capitulo", PATRON_CAPITULO)
+    patron_seccion = patrones.get("seccion", PATRON_SECCION)
+    # Prefijos literales: descartan con startswith las líneas que no pueden coincidir
+    prefijo_titulo = prefijo_literal(patron_titulo.pattern) if patron_titulo else ""
+    prefijo_capitulo = prefijo_literal(patron_capitulo.pattern) if patron_capitulo else ""
+    prefijo_seccion = prefijo_literal(patron_seccion.pattern) if patron_seccion else ""
+    # Letras con que puede empezar una división: descarta la mayoría de las
+    # líneas de cuerpo sin pasarlas a minúsculas. None si algún patrón activo
+    # no tiene prefijo literal (entonces cualquier línea puede coincidir)
+    prefijos_activos = [
+        prefijo for patron, prefijo in ((patron_titulo, prefijo_titulo),
+                                        (patron_capitulo, prefijo_capitulo),
+                                        (patron_seccion, prefijo_seccion))
+        if patron
+    ]
+    iniciales = None if not all(prefijos_activos) else frozenset(p[0] for p in prefijos_activos)
 
     def es_ruido(linea):
         """Línea de encabezado/pie que debe saltarse."""
-        return not linea or len(linea) <= 3 or re.match(patron_ruido, linea, re.IGNORECASE)
+        return not linea or len(linea) <= 3 or PATRON_RUIDO.match(linea)
 
     def es_nombre_division(linea):
         """Línea que puede ser nombre de una división."""
-        return not re.match(patron_no_nombre, linea, re.IGNORECASE)
+        return not PATRON_NO_NOMBRE.match(linea)
 
-    def buscar_nombre(lineas, idx, doc, page_num):
+    def buscar_nombre(lineas, idx, page_num):
         """Busca el primer renglón significativo y evalúa si es nombre."""
         # Buscar en la misma página
         for i in range(idx + 1, len(lineas)):
@@ -215,9 +265,8 @@ def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[Titulo
             return linea if es_nombre_division(linea) else None
 
         # Si no encontró en la misma página, buscar en la siguiente
-        if page_num + 1 < len(doc):
-            texto_sig = doc[page_num + 1].get_text()
-            for linea in texto_sig.split('\n'):
+        if page_num + 1 < len(textos):
+            for linea in textos[page_num + 1].split('\n'):
                 linea = linea.strip()
                 if es_ruido(linea):
                     continue
@@ -226,20 +275,22 @@ def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[Titulo
 
         return None
 
-    for page_num, page in enumerate(doc):
+    for page_num, texto in enumerate(textos):
         # Si hay límite de página, detenerse
         if pagina_fin and (page_num + 1) > pagina_fin:
             break
-        texto = page.get_text()
         lineas = texto.split('\n')
 
         for i, linea in enumerate(lineas):
             linea_limpia = linea.strip()
+            if iniciales is not None and linea_limpia[:1].lower() not in iniciales:
+                continue
+            linea_min = linea_limpia.lower()
 
             # ¿Es título?
-            match = re.match(patron_titulo, linea_limpia, re.IGNORECASE)
+            match = patron_titulo and linea_min.startswith(prefijo_titulo) and patron_titulo.match(linea_limpia)
             if match:
-                nombre = buscar_nombre(lineas, i, doc, page_num)
+                nombre = buscar_nombre(lineas, i, page_num)
 
                 titulo_actual = TituloRef(
                     numero=match.group(1).upper(),
@@ -251,13 +302,13 @@ def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[Titulo
                 continue
 
             # ¿Es capítulo?
-            match = re.match(patron_capitulo, linea_limpia, re.IGNORECASE)
+            match = patron_capitulo and linea_min.startswith(prefijo_capitulo) and patron_capitulo.match(linea_limpia)
             if match:
                 if titulo_actual is None:
                     titulo_actual = TituloRef(numero="PRELIMINAR", nombre=None, pagina=1)
                     titulos.insert(0, titulo_actual)
 
-                nombre = buscar_nombre(lineas, i, doc, page_num)
+                nombre = buscar_nombre(lineas, i, page_num)
 
                 capitulo_actual = CapituloRef(
                     numero=match.group(1).upper(),
@@ -268,12 +319,12 @@ def extraer_estructura(doc, config: dict, pagina_fin: int = None) -> list[Titulo
                 continue
 
             # ¿Es sección?
-            match = re.match(patron_seccion, linea_limpia, re.IGNORECASE)
+            match = patron_seccion and linea_min.startswith(prefijo_seccion) and patron_seccion.match(linea_limpia)
             if match:
                 if capitulo_actual is None:
                     continue  # Ignorar secciones sin capítulo
 
-                nombre = buscar_nombre(lineas, i, doc, page_num)
+                nombre = buscar_nombre(lineas, i, page_num)
 
                 seccion = SeccionRef(
                     numero=match.group(1).upper(),
@@ -302,6 +353,16 @@ def asignar_articulos_a_capitulos(titulos: list[TituloRef], articulos: list[Arti
             )
             titulo.capitulos.append(cap_virtual)
 
+    # Líneas por página, leídas una sola vez: capítulos, secciones y
+    # artículos de una misma página buscan sobre la misma lista
+    lineas_cache = {}
+
+    def lineas_pagina(page_idx):
+        lineas = lineas_cache.get(page_idx)
+        if lineas is None:
+            lineas = lineas_cache[page_idx] = leer_lineas(doc[page_idx])
+        return lineas
+
     # Crear lista de puntos de corte con coordenada Y
     # Incluye tanto capítulos como secciones
     puntos_corte = []  # (pagina, coordenada_y, objeto, tipo)
@@ -311,13 +372,12 @@ def asignar_articulos_a_capitulos(titulos: list[TituloRef], articulos: list[Arti
             # Obtener coordenada Y del capítulo en la página
             page_idx = cap.pagina - 1
             if page_idx >= 0 and page_idx < len(doc):
-                page = doc[page_idx]
                 # Para capítulos virtuales (UNICO), buscar posición del TÍTULO
                 if cap.numero == "UNICO" and cap.pagina == titulo.pagina:
-                    patron = rf'T[IÍ]TULO\s+{re.escape(titulo.numero)}\b'
+                    patron = re.compile(rf'T[IÍ]TULO\s+{re.escape(titulo.numero)}\b', re.IGNORECASE)
                 else:
-                    patron = rf'CAP[IÍ]TULO\s+{re.escape(cap.numero)}\b'
-                coord_y = obtener_coordenada_y(page, patron)
+                    patron = re.compile(rf'CAP[IÍ]TULO\s+{re.escape(cap.numero)}\b', re.IGNORECASE)
+                coord_y = obtener_coordenada_y(lineas_pagina(page_idx), patron)
             else:
                 coord_y = 0
 
@@ -326,9 +386,8 @@ def asignar_articulos_a_capitulos(titulos: list[TituloRef], articulos: list[Arti
                 for sec in cap.secciones:
                     page_idx = sec.pagina - 1
                     if page_idx >= 0 and page_idx < len(doc):
-                        page = doc[page_idx]
-                        patron = rf'SECCI[OÓ]N\s+{re.escape(sec.numero)}'
-                        coord_y_sec = obtener_coordenada_y(page, patron)
+                        patron = re.compile(rf'SECCI[OÓ]N\s+{re.escape(sec.numero)}', re.IGNORECASE)
+                        coord_y_sec = obtener_coordenada_y(lineas_pagina(page_idx), patron)
                     else:
                         coord_y_sec = 0
                     puntos_corte.append((sec.pagina, coord_y_sec, sec, 'seccion'))
@@ -343,30 +402,26 @@ def asignar_articulos_a_capitulos(titulos: list[TituloRef], articulos: list[Arti
     for art in articulos:
         page_idx = art.pagina - 1
         if page_idx >= 0 and page_idx < len(doc):
-            page = doc[page_idx]
             # Buscar coordenada Y del artículo
             num_escapado = art.numero.replace('-', r'\.?[-–]').replace(' ', r'[\s_]*')
-            patron = rf'Art[íi]culo[\s_]+{num_escapado}'
-            coord_y = obtener_coordenada_y(page, patron)
+            patron = re.compile(rf'Art[íi]culo[\s_]+{num_escapado}', re.IGNORECASE)
+            coord_y = obtener_coordenada_y(lineas_pagina(page_idx), patron)
         else:
             coord_y = 0
         articulos_con_pos.append((art, coord_y))
 
     # Asignar cada artículo al punto de corte correspondiente (capítulo o sección)
+    claves_corte = [(pagina, pos) for pagina, pos, obj, tipo in puntos_corte]
     for art, pos_art in articulos_con_pos:
-        punto_asignado = None
-
-        for pagina, pos, obj, tipo in puntos_corte:
-            # El artículo pertenece a este punto si:
-            # - Está en una página posterior, O
-            # - Está en la misma página pero después del encabezado
-            if art.pagina > pagina:
-                punto_asignado = obj
-            elif art.pagina == pagina and pos_art >= pos:
-                punto_asignado = obj
-
-        if punto_asignado:
-            punto_asignado.articulos.append(art)
+        # El artículo pertenece al último punto que tenga antes:
+        # - Está en una página posterior, O
+        # - Está en la misma página pero después del encabezado
+        # Es decir (pagina, pos) <= (art.pagina, pos_art); con los puntos
+        # ordenados, esos forman un prefijo y bisect da el último.
+        idx = bisect_right(claves_corte, (art.pagina, pos_art)) - 1
+
+        if idx >= 0:
+            puntos_corte[idx][2].articulos.append(art)
         elif puntos_corte:
             # Si el artículo está antes del primer punto, asignar al primero
             puntos_corte[0][2].articulos.append(art)
@@ -411,14 +466,6 @@ def extraer_mapa(codigo: str) -> list[TituloRef]:
                 ))
             print(f"   Cargados: {len(articulos)} artículos")
 
-    # 2. Marcar derogados (in-place)
-    print("   Detectando artículos derogados...")
-    marcar_derogados(doc, articulos)
-    derogados_count = sum(1 for a in articulos if a.derogado)
-    print(f"   Vigentes: {len(articulos) - derogados_count}, Derogados: {derogados_count}")
-
-    # 3. Extraer estructura (Títulos/Capítulos)
-    print("   Extrayendo estructura jerárquica...")
     pagina_fin = config.get("pagina_fin_contenido")
 
     # Si no hay pagina_fin configurada, detectar desde outline (TRANSITORIOS)
@@ -429,7 +476,20 @@ def extraer_mapa(codigo: str) -> list[TituloRef]:
                 pagina_fin = page
                 break
 
-    titulos = extraer_estructura(doc, config, pagina_fin)
+    # Texto de las páginas que usan derogados y estructura (la estructura
+    # puede leer el nombre de una división en la página siguiente a pagina_fin)
+    hasta = pagina_fin + 1 if pagina_fin else len(doc)
+    textos = leer_textos(doc, max([hasta] + [a.pagina for a in articulos]))
+
+    # 2. Marcar derogados (in-place)
+    print("   Detectando artículos derogados...")
+    marcar_derogados(textos, articulos)
+    derogados_count = sum(1 for a in articulos if a.derogado)
+    print(f"   Vigentes: {len(articulos) - derogados_count}, Derogados: {derogados_count}")
+
+    # 3. Extraer estructura (Títulos/Capítulos)
+    print("   Extrayendo estructura jerárquica...")
+    titulos = extraer_estructura(textos, config, pagina_fin)
 
     # Si no hay estructura pero sí artículos, crear título/capítulo virtual
     if not titulos and articulos:
@@ -616,8 +676,7 @@ def main():
     mapa_json_final["metodo"] = "outline"
     mapa_json_final["notas"] = "Extraído del outline del PDF. Fuente autoritativa."
 
-    with open(mapa_path, 'w', encoding='utf-8') as f:
-        json.dump(mapa_json_final, f, ensure_ascii=False, indent=2)
+    escribir_json(mapa_path, mapa_json_final)
 
     print("   Guardado")
     print("\n" + "=" * 60)
@@ -14,6 +14,8 @@ Uso:
 import re
 import json
 import sys
+from bisect import bisect_left
+from collections import defaultdict
 from dataclasses import dataclass, field, asdict
 from typing import Optional
 from pathlib import Path
@@ -35,6 +37,24 @@ X_TOLERANCE = 10  # Tolerancia para matching
 # En el CFF: gap=10 es línea continua, gap=15 es párrafo nuevo
 Y_PARAGRAPH_GAP = 12  # Umbral conservador
 
+# Líneas de header/footer: una sola alternación en lugar de un `in` por cadena
+RUIDO = re.compile('|'.join(re.escape(s) for s in [
+    'CÓDIGO FISCAL', 'CÁMARA DE DIPUTADOS', 'Secretaría General',
+    'Servicios Parlamentarios', 'DOF', 'de 375', 'Última Reforma',
+]))
+
+# Identificadores al inicio de línea
+_RE_FRACCION = re.compile(r'^([IVXLC]+)\.\s*(.*)$')
+_RE_INCISO = re.compile(r'^([a-z])\)\s*(.*)$')
+_RE_NUMERAL = re.compile(r'^(\d+)\.\s*(.*)$')
+_RE_NUMERAL_INICIO = re.compile(r'^\d+\.')
+
+# Encabezado de cualquier artículo (no depende del artículo buscado)
+_RE_SIGUIENTE_PAGINA = re.compile(r'Artículo\s+\d+[o]?(?:-[A-Z])?\.[\-\s]')
+_RE_SIGUIENTE_LINEA = re.compile(
+    r'Artículo\s+\d+[o]?(?:-[A-Z])?(?:\s+[A-Z][a-z]+)?\.[\-\s]', re.IGNORECASE
+)
+
 
 @dataclass
 class Parrafo:
@@ -53,21 +73,27 @@ def detectar_tipo_identificador(texto: str) -> tuple[str, Optional[str], str]:
     Retorna: (tipo, identificador, contenido_sin_identificador)
     """
     texto = texto.strip()
+    # Los tres tipos se distinguen por el primer carácter: solo se prueba
+    # el patrón que puede coincidir (ninguno en texto corrido)
+    c0 = texto[:1]
 
     # Fracción romana: I., II., III., IV., V., VI., VII., VIII., IX., X., etc.
-    match = re.match(r'^([IVXLC]+)\.\s*(.*)$', texto)
-    if match:
-        return ('fraccion', match.group(1), match.group(2))
+    if c0 in 'IVXLC':
+        match = _RE_FRACCION.match(texto)
+        if match:
+            return ('fraccion', match.group(1), match.group(2))
 
     # Inciso: a), b), c), etc.
-    match = re.match(r'^([a-z])\)\s*(.*)$', texto)
-    if match:
-        return ('inciso', match.group(1) + ')', match.group(2))
+    elif c0.islower():
+        match = _RE_INCISO.match(texto)
+        if match:
+            return ('inciso', match.group(1) + ')', match.group(2))
 
     # Numeral: 1., 2., 3., etc.
-    match = re.match(r'^(\d+)\.\s*(.*)$', texto)
-    if match:
-        return ('numeral', match.group(1) + '.', match.group(2))
+    elif c0.isdigit():
+        match = _RE_NUMERAL.match(texto)
+        if match:
+            return ('numeral', match.group(1) + '.', match.group(2))
 
     return ('texto', None, texto)
 
@@ -92,12 +118,9 @@ def extraer_lineas_pagina(page) -> list[dict]:
     words = page.extract_words(keep_blank_chars=True, x_tolerance=3, y_tolerance=3)
 
     # Agrupar por línea (mismo Y aproximado)
-    lines = {}
+    lines = defaultdict(list)
     for w in words:
-        y_key = round(w['top'] / 5) * 5
-        if y_key not in lines:
-            lines[y_key] = []
-        lines[y_key].append(w)
+        lines[round(w['top'] / 5) * 5].append(w)
 
     result = []
     for y_key in sorted(lines.keys()):
@@ -118,7 +141,7 @@ def encontrar_articulo(pdf, numero_articulo: str) -> tuple[int, int]:
     """
     # Soporta formatos: "Artículo 2o." y "Artículo 2o.-" con espacios variables
     patron_inicio = re.compile(rf'Artículo\s+{re.escape(numero_articulo)}\.[\-\s]')
-    patron_siguiente = re.compile(r'Artículo\s+\d+[o]?(?:-[A-Z])?\.[\-\s]')
+    patron_siguiente = _RE_SIGUIENTE_PAGINA
 
     pagina_inicio = None
     pagina_fin = None
@@ -173,7 +196,7 @@ def _extraer_articulo_interno(pdf, numero_articulo: str, quiet: bool) -> list[Pa
     # Soporta formatos: "Artículo 2o." y "Artículo 2o.-" con espacios variables
     patron_art = re.compile(rf'Artículo\s+{re.escape(numero_articulo)}\.[\-\s]?')
     # Patrón para detectar siguiente artículo (más robusto)
-    patron_siguiente = re.compile(r'Artículo\s+\d+[o]?(?:-[A-Z])?(?:\s+[A-Z][a-z]+)?\.[\-\s]', re.IGNORECASE)
+    patron_siguiente = _RE_SIGUIENTE_LINEA
     en_articulo = False
 
     for pag_num in range(pag_inicio, pag_fin + 1):
@@ -183,9 +206,7 @@ def _extraer_articulo_interno(pdf, numero_articulo: str, quiet: bool) -> list[Pa
             text = linea['text']
 
             # Filtrar líneas de header/footer primero
-            if any(skip in text for skip in ['CÓDIGO FISCAL', 'CÁMARA DE DIPUTADOS',
-                                               'Secretaría General', 'Servicios Parlamentarios',
-                                               'DOF', 'de 375', 'Última Reforma']):
+            if RUIDO.search(text):
                 continue
 
             # Detectar inicio del artículo
@@ -224,9 +245,10 @@ def construir_jerarquia(lineas: list[dict], numero_articulo: str) -> list[Parraf
     parrafos = []
     numero = 0
 
-    # Stack para tracking de elementos por X aproximado
-    # Clave = X redondeado a decenas, Valor = número de párrafo
-    ultimo_por_x = {}
+    # Stack para tracking de elementos por X aproximado, como listas paralelas
+    # ordenadas por X (redondeado a decenas) -> número de párrafo
+    x_keys = []
+    x_numeros = []
 
     # También mantener tracking por tipo para casos simples
     ultimo_por_nivel = {0: None, 1: None, 2: None, 3: None}
@@ -248,10 +270,11 @@ def construir_jerarquia(lineas: list[dict], numero_articulo: str) -> list[Parraf
         """Detecta si una línea es continuación por wrap (empieza con minúscula o puntuación)."""
         if not texto:
             return False
-        primer_char = texto.strip()[0] if texto.strip() else ''
+        texto = texto.strip()
+        primer_char = texto[:1]
         # Continuación si empieza con minúscula, número (sin punto después), o ciertos caracteres
         return primer_char.islower() or primer_char in ',:;.()' or \
-               (primer_char.isdigit() and not re.match(r'^\d+\.', texto.strip()))
+               (primer_char.isdigit() and not _RE_NUMERAL_INICIO.match(texto))
 
     for linea in lineas:
         x, y, text = linea['x'], linea['y'], linea['text']
@@ -328,14 +351,9 @@ def construir_jerarquia(lineas: list[dict], numero_articulo: str) -> list[Parraf
         # Determinar padre basado en X
         # Buscar el elemento más cercano con X menor (padre)
         def encontrar_padre_por_x(x_actual: int) -> Optional[int]:
-            """Encuentra el padre buscando el elemento con X menor más cercano."""
-            candidatos = [(x_key, num) for x_key, num in ultimo_por_x.items()
-                          if x_key < x_actual - X_TOLERANCE]
-            if not candidatos:
-                return None
-            # El padre es el de X más grande que sea menor que x_actual
-            candidatos.sort(key=lambda t: t[0], reverse=True)
-            return candidatos[0][1]
+            """Encuentra el padre: el elemento con el mayor X menor que x_actual - X_TOLERANCE."""
+            i = bisect_left(x_keys, x_actual - X_TOLERANCE)
+            return x_numeros[i - 1] if i > 0 else None
 
         if tipo == 'fraccion':
             padre = None  # Las fracciones son hijos directos del artículo
@@ -366,9 +384,12 @@ def construir_jerarquia(lineas: list[dict], numero_articulo: str) -> list[Parraf
 
         # Actualizar tracking por X
         x_key = round(x / 10) * 10  # Redondear a decenas
-        ultimo_por_x[x_key] = numero
-        # Limpiar X mayores (ya no son válidos como padres de nuevos elementos)
-        ultimo_por_x = {k: v for k, v in ultimo_por_x.items() if k <= x_key}
+        # Limpiar X mayores o iguales (los mayores ya no son válidos como padres
+        # de nuevos elementos) y registrar este párrafo en su X
+        pos = bisect_left(x_keys, x_key)
+        del x_keys[pos:], x_numeros[pos:]
+        x_keys.append(x_key)
+        x_numeros.append(numero)
 
         # También actualizar por nivel/tipo
         if tipo in ('fraccion', 'inciso', 'numeral'):
@@ -15,7 +15,6 @@ Uso:
 """
 
 import re
-import json
 import sys
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -31,6 +30,7 @@ BASE_DIR = Path(__file__).parent.parent.parent
 
 # Importar configuración desde config.py
 from config import LEYES
+from archivos_json import escribir_json, escribir_contenido
 
 # Constantes de detección visual
 PAGINA_WIDTH = 612  # Ancho estándar carta
@@ -41,6 +41,8 @@ MARGEN_IZQUIERDO = 99  # X donde empiezan las reglas
 # Patrones
 PATRON_TITULO = re.compile(r'^Título\s+(\d+)\.\s+(.+)$')
 PATRON_CAPITULO = re.compile(r'^Capítulo\s+(\d+\.\d+)\.\s+(.+)$')
+# Título o capítulo en una sola alternación (cuando no importa cuál de los dos es)
+PATRON_DIVISION = re.compile(r'^(?:Título\s+\d+|Capítulo\s+\d+\.\d+)\.\s+.+$')
 PATRON_REGLA = re.compile(r'^(\d+\.\d+\.\d+(?:\.\d+)?)\.\s*$')
 PATRON_FECHA_DOF = re.compile(r'(\d{1,2})\s+de\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)\s+de\s+(\d{4})', re.IGNORECASE)
 
@@ -79,7 +81,7 @@ X_CONTENIDO_NUM = 269  # Contenido de numerales (x4)
 X_TOLERANCIA = 10  # Tolerancia para comparación
 
 
-@dataclass
+@dataclass(slots=True)
 class Parrafo:
     """Párrafo de contenido."""
     tipo: str  # texto, fraccion, inciso
@@ -87,7 +89,7 @@ class Parrafo:
     numero: Optional[str] = None  # I, II, III para fracciones; a, b, c para incisos
 
 
-@dataclass
+@dataclass(slots=True)
 class ReglaContenido:
     """Contenido completo de una regla."""
     numero: str
@@ -96,7 +98,7 @@ class ReglaContenido:
     referencias: Optional[str] = None  # "CFF 28, 31, LISR 5"
 
 
-@dataclass
+@dataclass(slots=True)
 class ReglaRef:
     """Referencia a una regla."""
     numero: str
@@ -104,7 +106,7 @@ class ReglaRef:
     nombre: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CapituloRef:
     """Referencia a un capítulo."""
     numero: str
@@ -113,7 +115,7 @@ class CapituloRef:
     reglas: list[ReglaRef] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TituloRef:
     """Referencia a un título."""
     numero: str
@@ -173,7 +175,37 @@ def linea_es_bold(spans: list) -> bool:
     return texto_total > 0 and (texto_bold / texto_total) > 0.8
 
 
-def extraer_estructura(doc) -> list[TituloRef]:
+def leer_bloques(doc) -> list[list[dict]]:
+    """
+    Lee una sola vez los bloques de texto de cada página (get_text("dict")).
+
+    Estructura, reglas y contenido recorren la misma lista en lugar de
+    volver a parsear el PDF en cada pasada. Como la lista se conserva
+    completa mientras corren las pasadas, de cada bloque solo se guardan
+    los campos que ellas leen: bbox de la línea y text/bbox/flags de cada
+    span (sin fuente, tamaño, color, origin, etc.). Los bloques de imagen
+    se descartan: ninguna pasada los usa y traen los bytes de la imagen.
+    """
+    paginas = []
+    for page in doc:
+        paginas.append([
+            {"lines": [
+                {
+                    "bbox": line["bbox"],
+                    "spans": [
+                        {"text": span["text"], "bbox": span["bbox"], "flags": span["flags"]}
+                        for span in line["spans"]
+                    ],
+                }
+                for line in block["lines"]
+            ]}
+            for block in page.get_text("dict")["blocks"]
+            if "lines" in block
+        ])
+    return paginas
+
+
+def extraer_estructura(paginas: list[list[dict]]) -> list[TituloRef]:
     """
     Extrae la estructura jerárquica (Títulos/Capítulos) del PDF.
 
@@ -184,29 +216,21 @@ def extraer_estructura(doc) -> list[TituloRef]:
     titulos = []
     titulo_actual = None
 
-    for page_num, page in enumerate(doc):
-        blocks = page.get_text("dict")["blocks"]
-
+    for page_num, blocks in enumerate(paginas):
         for block in blocks:
             if "lines" not in block:
                 continue
 
             for line in block["lines"]:
-                # Reconstruir línea completa
-                texto_linea = ""
-                x_min = float('inf')
-                x_max = 0
-
-                for span in line["spans"]:
-                    texto_linea += span["text"]
-                    bbox = span["bbox"]
-                    x_min = min(x_min, bbox[0])
-                    x_max = max(x_max, bbox[2])
-
-                texto_linea = texto_linea.strip()
+                # Reconstruir línea completa (un solo join en lugar de concatenar por span)
+                spans = line["spans"]
+                texto_linea = "".join(span["text"] for span in spans).strip()
                 if not texto_linea:
                     continue
 
+                x_min = min(span["bbox"][0] for span in spans)
+                x_max = max(0, max(span["bbox"][2] for span in spans))
+
                 # Solo procesar si está centrado y bold
                 if not (es_centrado(x_min, x_max) and linea_es_bold(line["spans"])):
                     continue
@@ -240,7 +264,7 @@ def extraer_estructura(doc) -> list[TituloRef]:
     return titulos
 
 
-def extraer_reglas(doc) -> list[ReglaRef]:
+def extraer_reglas(paginas: list[list[dict]]) -> list[ReglaRef]:
     """
     Extrae todas las reglas del PDF.
 
@@ -252,9 +276,7 @@ def extraer_reglas(doc) -> list[ReglaRef]:
     reglas = []
     reglas_vistas = set()
 
-    for page_num, page in enumerate(doc):
-        blocks = page.get_text("dict")["blocks"]
-
+    for page_num, blocks in enumerate(paginas):
         for block in blocks:
             if "lines" not in block:
                 continue
@@ -280,12 +302,12 @@ def extraer_reglas(doc) -> list[ReglaRef]:
     return reglas
 
 
-def extraer_contenido(doc, reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
+def extraer_contenido(paginas: list[list[dict]], reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
     """
     Extrae el contenido de cada regla del PDF.
 
     Args:
-        doc: Documento PyMuPDF
+        paginas: Bloques de texto por página (ver leer_bloques)
         reglas: Lista de reglas con sus páginas
 
     Returns:
@@ -293,16 +315,8 @@ def extraer_contenido(doc, reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
     """
     contenido = {}
 
-    # Crear índice de reglas por página para saber cuándo termina cada una
-    reglas_por_pagina = {}
-    for regla in reglas:
-        if regla.pagina not in reglas_por_pagina:
-            reglas_por_pagina[regla.pagina] = []
-        reglas_por_pagina[regla.pagina].append(regla.numero)
-
-    # Ordenar reglas para saber la siguiente
-    reglas_ordenadas = sorted([r.numero for r in reglas], key=lambda x: [int(p) for p in x.split('.')])
-    siguiente_regla = {reglas_ordenadas[i]: reglas_ordenadas[i+1] for i in range(len(reglas_ordenadas)-1)}
+    # Números de regla conocidos: consulta O(1) por línea candidata
+    numeros_reglas = {r.numero for r in reglas}
 
     regla_actual = None
     parrafos_actuales = []
@@ -357,27 +371,21 @@ def extraer_contenido(doc, reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
         y_anterior = None
         referencias_encontradas = False
 
-    for page_num, page in enumerate(doc):
-        blocks = page.get_text("dict")["blocks"]
-
+    for page_num, blocks in enumerate(paginas):
         for block in blocks:
             if "lines" not in block:
                 continue
 
             for line in block["lines"]:
-                # Reconstruir línea y obtener coordenadas
-                texto_linea = ""
-                x_min = float('inf')
-                y_actual = line["bbox"][1]
-
-                for span in line["spans"]:
-                    texto_linea += span["text"]
-                    x_min = min(x_min, span["bbox"][0])
-
-                texto_linea = texto_linea.strip()
+                # Reconstruir línea y obtener coordenadas (un solo join en lugar de concatenar por span)
+                spans = line["spans"]
+                texto_linea = "".join(span["text"] for span in spans).strip()
                 if not texto_linea:
                     continue
 
+                x_min = min(span["bbox"][0] for span in spans)
+                y_actual = line["bbox"][1]
+
                 # Detectar si la línea es bold
                 es_bold = linea_es_bold(line["spans"])
 
@@ -385,7 +393,7 @@ def extraer_contenido(doc, reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
                 match_regla = PATRON_REGLA_INICIO.match(texto_linea)
                 if match_regla and abs(x_min - X_REGLA) < X_TOLERANCIA:
                     numero = match_regla.group(1)
-                    if numero in [r.numero for r in reglas]:
+                    if numero in numeros_reglas:
                         guardar_regla()
                         regla_actual = numero
                         y_anterior = None  # Reset para nueva regla
@@ -403,7 +411,7 @@ def extraer_contenido(doc, reglas: list[ReglaRef]) -> dict[str, ReglaContenido]:
                         continue
 
                 # Detectar Título/Capítulo (limpia titulo_pendiente porque es nueva sección)
-                if PATRON_TITULO.match(texto_linea) or PATRON_CAPITULO.match(texto_linea):
+                if PATRON_DIVISION.match(texto_linea):
                     titulo_pendiente = None
                     continue
 
@@ -574,10 +582,8 @@ def verificar_integridad(titulos: list[TituloRef], reglas: list[ReglaRef]) -> di
     return resultado
 
 
-def generar_json_contenido(titulos: list[TituloRef], contenido: dict[str, ReglaContenido]) -> dict:
-    """Genera JSON de contenido (equivalente a contenido.json)."""
-    resultado = {"articulos": []}
-
+def generar_articulos_json(titulos: list[TituloRef], contenido: dict[str, ReglaContenido]):
+    """Genera, una a una, las reglas de contenido.json (ver escribir_contenido)."""
     orden = 0
     for titulo in titulos:
         for cap in titulo.capitulos:
@@ -605,10 +611,10 @@ def generar_json_contenido(titulos: list[TituloRef], contenido: dict[str, ReglaC
                         }
                         articulo["parrafos"].append(parrafo)
 
-                    resultado["articulos"].append(articulo)
+                    yield articulo
                 else:
                     # Regla sin contenido extraído
-                    resultado["articulos"].append({
+                    yield {
                         "numero": regla_ref.numero,
                         "orden": orden,
                         "tipo": "regla",
@@ -616,9 +622,7 @@ def generar_json_contenido(titulos: list[TituloRef], contenido: dict[str, ReglaC
                         "nombre": None,
                         "parrafos": [],
                         "referencias": None
-                    })
-
-    return resultado
+                    }
 
 
 def generar_json_estructura(titulos: list[TituloRef]) -> dict:
@@ -719,15 +723,16 @@ def main():
 
     doc = fitz.open(str(pdf_path))
     print(f"\nPDF: {pdf_path.name} ({len(doc)} páginas)")
+    paginas = leer_bloques(doc)
 
     # 1. Extraer estructura
     print("\n1. Extrayendo estructura (Títulos/Capítulos)...")
-    titulos = extraer_estructura(doc)
+    titulos = extraer_estructura(paginas)
     print(f"   Encontrados: {len(titulos)} títulos, {sum(len(t.capitulos) for t in titulos)} capítulos")
 
     # 2. Extraer reglas
     print("\n2. Extrayendo reglas...")
-    reglas = extraer_reglas(doc)
+    reglas = extraer_reglas(paginas)
     print(f"   Encontradas: {len(reglas)} reglas")
 
     # 3. Asignar reglas a capítulos
@@ -751,7 +756,7 @@ def main():
     contenido = {}
     if not solo_estructura:
         print("\n5. Extrayendo contenido de reglas...")
-        contenido = extraer_contenido(doc, reglas)
+        contenido = extraer_contenido(paginas, reglas)
         reglas_con_contenido = sum(1 for r in contenido.values() if r.parrafos)
         reglas_con_refs = sum(1 for r in contenido.values() if r.referencias)
         print(f"   Reglas con contenido: {reglas_con_contenido}")
@@ -795,16 +800,13 @@ def main():
         mapa_json_final["metodo"] = "texto"
         mapa_json_final["notas"] = "Extraído del texto del PDF (sin outline)."
 
-        with open(mapa_path, 'w', encoding='utf-8') as f:
-            json.dump(mapa_json_final, f, ensure_ascii=False, indent=2)
+        escribir_json(mapa_path, mapa_json_final)
         print("   Guardado")
 
     if not solo_estructura and contenido:
         contenido_path = output_dir / "contenido.json"
         print(f"\n7b. Guardando {contenido_path.name}...")
 
-        contenido_json = generar_json_contenido(titulos, contenido)
-
         # Advertencia sagrada - este archivo es fuente única de verdad
         contenido_json_final = {
             "_advertencia": [
@@ -823,7 +825,7 @@ def main():
                 "╚══════════════════════════════════════════════════════════════════╝"
             ],
             "_generado_por": "extraer_rmf.py",
-            **contenido_json
+            "articulos": []  # Se escriben una a una en escribir_contenido
         }
         contenido_json_final["ley"] = codigo
         contenido_json_final["fuente"] = config.get("url_fuente", "")
@@ -837,9 +839,9 @@ def main():
             print("   ERROR: No se pudo extraer fecha DOF")
             sys.exit(1)
 
-        with open(contenido_path, 'w', encoding='utf-8') as f:
-            json.dump(contenido_json_final, f, ensure_ascii=False, indent=2)
-        print(f"   Guardado ({len(contenido_json_final['articulos'])} reglas)")
+        total = escribir_contenido(contenido_path, contenido_json_final,
+                                   generar_articulos_json(titulos, contenido))
+        print(f"   Guardado ({total} reglas)")
 
     doc.close()
 
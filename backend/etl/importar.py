@@ -15,6 +15,7 @@ import os
 import sys
 from dataclasses import asdict
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -40,6 +41,7 @@ def get_connection():
     )
 
 
+@lru_cache(maxsize=None)
 def normalizar_numero(numero: str) -> str:
     """Normaliza número de artículo para comparación.
 
@@ -96,7 +96,7 @@ CREATE TABLE leyesmx.articulos (
         REFERENCES leyesmx.divisiones(id, ley) ON DELETE CASCADE
 );
 
-CREATE INDEX articulos_ley_idx ON leyesmx.articulos(ley);
+CREATE INDEX articulos_ley_orden_idx ON leyesmx.articulos(ley, orden);  -- Filtro por ley y recorrido en orden (checksums.py)
 CREATE INDEX articulos_division_idx ON leyesmx.articulos(division_id);
 CREATE INDEX articulos_tipo_idx ON leyesmx.articulos(tipo);
 CREATE INDEX articulos_search_idx ON leyesmx.articulos